@@ -4,32 +4,47 @@ Chaos Engineering Tests for Distributed Milvus
 Tests system resilience under various failure conditions
 """
 
+import os
 import time
 import random
+import itertools
 import numpy as np
 from typing import List, Dict, Tuple
 from pymilvus import MilvusClient, DataType
-from docker_utils import DockerManager
-from database_utils import DatabaseManager
+from docker_utils import get_docker_manager
+from database_utils import DatabaseManager, EXPECTED_FAILURE_TIMEOUT
 import threading
 import concurrent.futures
 
+BANNER = "=" * 60
+
+# Chaos tests exercise system behavior, not embedding realism, so keep vectors small
+VECTOR_DIM = 128
+
 class ChaosEngineer:
     """Chaos engineering test suite for distributed Milvus"""
     
     def __init__(self, uri: str = "http://localhost:19530"):
         # Ensure Docker containers are running before starting tests
         self.db_manager = DatabaseManager(uri, ensure_docker_running=True)
-        self.docker_manager = DockerManager()
+        self.docker_manager = get_docker_manager()
         self.results = {}
         
+        # Pre-generated query vectors, cycled through by _probe()
+        self._probe_pool = np.random.default_rng().random((64, VECTOR_DIM), dtype=np.float32)
+        self._probe_counter = itertools.count()
+        
+    def _probe(self) -> np.ndarray:
+        """Return the next query vector from the pre-generated pool"""
+        return self._probe_pool[next(self._probe_counter) % len(self._probe_pool)]
+    
     def setup_chaos_collection(self, collection_name: str = "chaos_test"):
         """Setup collection for chaos testing"""
-        return self.db_manager.create_chaos_collection(collection_name)
+        return self.db_manager.create_chaos_collection(collection_name, vector_dim=VECTOR_DIM)
     
-    def test_random_container_restarts(self, duration_minutes: int = 5):
-        """Test system resilience with random container restarts"""
-        print(f"\n🧪 Testing Random Container Restarts ({duration_minutes} minutes)")
+    def test_random_container_restarts(self, duration_minutes: int = 5, max_workers: int = 16):
+        """Test system resilience with random container restarts under concurrent load"""
+        print(f"\n🧪 Testing Random Container Restarts ({duration_minutes} minutes, {max_workers} workers)")
         
         # List of containers to restart
         restartable_containers = [
@@ -38,55 +53,86 @@ class ChaosEngineer:
             'milvus-indexnode1', 'milvus-indexnode2'
         ]
         
+        # Precompute the restart schedule from a logged seed so a failing run can be
+        # replayed with CHAOS_SEED=<seed>; at most one roll per second is consumed
+        seed = int(os.environ.get("CHAOS_SEED", time.time()))
+        print(f"   🎲 Chaos seed: {seed}")
+        rng = random.Random(seed)
+        schedule = [(rng.random() < 0.3, rng.choice(restartable_containers))  # 30% chance
+                    for _ in range(duration_minutes * 60)]
+        
         start_time = time.time()
         end_time = start_time + (duration_minutes * 60)
         restart_count = 0
         successful_operations = 0
         failed_operations = 0
+        counter_lock = threading.Lock()
+        op_ids = itertools.count()
         
         def perform_operations():
             nonlocal successful_operations, failed_operations
             try:
-                # Insert operation
-                data = self.db_manager.generate_test_data(1, prefix=f"chaos_insert_{int(time.time())}")
-                self.db_manager.insert_data("chaos_test", data)
+                # Insert operation (unique prefix per op, workers run within the same second)
+                data = self.db_manager.generate_test_data(1, vector_dim=VECTOR_DIM, prefix=f"chaos_insert_{next(op_ids)}")
+                inserted = self.db_manager.insert_data("chaos_test", data)
                 
-                # Search operation
-                query_vector = np.random.rand(2048).tolist()
-                results = self.db_manager.search_vectors(
+                # Search operation; the per-query form returns [] only when the search failed,
+                # so a failure is not confused with a search that found nothing
+                query_vector = self._probe()
+                results = self.db_manager.search_vectors_per_query(
                     collection_name="chaos_test",
                     query_vectors=[query_vector],
                     limit=5
                 )
-                
-                successful_operations += 1
-                return True
-                
-            except Exception as e:
-                failed_operations += 1
-                return False
+                ok = inserted and bool(results)
+            except Exception:
+                ok = False
+            
+            with counter_lock:
+                if ok:
+                    successful_operations += 1
+                else:
+                    failed_operations += 1
+            return ok
+        
+        def keep_load_running():
+            # Each worker issues operations back to back until the test ends, so load
+            # continues through restarts and recovery waits on the main thread; after a
+            # failure it backs off (0.1s doubling to 2s) instead of hammering a down node
+            backoff = 0.1
+            while time.time() < end_time:
+                if perform_operations():
+                    backoff = 0.1
+                else:
+                    time.sleep(min(backoff, max(end_time - time.time(), 0)))
+                    backoff = min(backoff * 2, 2.0)
         
         try:
-            while time.time() < end_time:
-                # Perform operations
-                success = perform_operations()
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+                for _ in range(max_workers):
+                    pool.submit(keep_load_running)
                 
-                # Randomly restart a container
-                if random.random() < 0.3:  # 30% chance
-                    container = random.choice(restartable_containers)
-                    print(f"   🔄 Restarting {container}...")
+                for should_restart, container in schedule:
+                    if time.time() >= end_time:
+                        break
                     
-                    if self.docker_manager.restart_container(container):
-                        restart_count += 1
-                        print(f"   ✅ {container} restarted successfully")
-                    else:
-                        print(f"   ❌ Failed to restart {container}")
+                    # Restart a container when the schedule says so
+                    if should_restart:
+                        print(f"   🔄 Restarting {container}...")
+                        
+                        if self.docker_manager.restart_container(container):
+                            restart_count += 1
+                            print(f"   ✅ {container} restarted successfully")
+                        else:
+                            print(f"   ❌ Failed to restart {container}")
+                        
+                        # Wait for system to stabilize
+                        if not self.db_manager.wait_for_collection_serving("chaos_test"):
+                            print(f"   ⚠️ chaos_test not serving after restarting {container}")
                     
-                    # Wait for system to stabilize
-                    time.sleep(10)
-                
-                # Small delay between operations
-                time.sleep(1)
+                    # Restart rolls stay at ~1/s regardless of how fast operations complete
+                    time.sleep(1)
+                # Leaving the with-block waits for the workers, which stop on their own at end_time
             
             self.results['random_restarts'] = {
                 'duration_minutes': duration_minutes,
@@ -114,15 +160,17 @@ class ChaosEngineer:
             print("   ❌ Failed to stop querynode1")
             return False
         
-        time.sleep(5)
+        if not self.db_manager.wait_for_collection_serving("chaos_test", after_disruption=True):
+            print("   ❌ chaos_test stopped serving with querynode1 down")
+            return False
         
         # Test operations with one node down
         print("   🔍 Testing operations with querynode1 down...")
         try:
-            data = self.db_manager.generate_test_data(1, prefix="cascade_test_1")
+            data = self.db_manager.generate_test_data(1, vector_dim=VECTOR_DIM, prefix="cascade_test_1")
             self.db_manager.insert_data("chaos_test", data)
             
-            query_vector = np.random.rand(2048).tolist()
+            query_vector = self._probe()
             results = self.db_manager.search_vectors(
                 collection_name="chaos_test",
                 query_vectors=[query_vector],
@@ -144,9 +192,15 @@ class ChaosEngineer:
         
         # Test operations with both nodes down (should fail)
         print("   🔍 Testing operations with both nodes down...")
+        # Inserts only need the proxy and Kafka, so probe with a search, which needs a query
+        # node; search_vectors swallows errors, so call the client directly
         try:
-            data = self.db_manager.generate_test_data(1, prefix="cascade_test_2")
-            self.db_manager.insert_data("chaos_test", data)
+            self.db_manager.client.search(
+                collection_name="chaos_test",
+                data=[self._probe()],
+                limit=1,
+                timeout=EXPECTED_FAILURE_TIMEOUT
+            )
             print("   ⚠️ UNEXPECTED: Operations still working with both nodes down!")
             return False
             
@@ -155,23 +209,24 @@ class ChaosEngineer:
         
         # Step 3: Restart both nodes
         print("   🔄 Step 3: Restarting both query nodes...")
-        if not self.docker_manager.start_container("milvus-querynode1"):
-            print("   ❌ Failed to restart querynode1")
+        started = self.docker_manager.start_containers(["milvus-querynode1", "milvus-querynode2"])
+        failed = [name for name, ok in started.items() if not ok]
+        if failed:
+            print(f"   ❌ Failed to restart {', '.join(failed)}")
             return False
         
-        if not self.docker_manager.start_container("milvus-querynode2"):
-            print("   ❌ Failed to restart querynode2")
+        # Wait for recovery
+        if not self.db_manager.wait_for_collection_serving("chaos_test"):
+            print("   ❌ chaos_test did not recover after restarting both query nodes")
             return False
         
-        time.sleep(15)  # Wait for recovery
-        
         # Test operations after recovery
         print("   🔍 Testing operations after recovery...")
         try:
-            data = self.db_manager.generate_test_data(1, prefix="cascade_test_3")
+            data = self.db_manager.generate_test_data(1, vector_dim=VECTOR_DIM, prefix="cascade_test_3")
             self.db_manager.insert_data("chaos_test", data)
             
-            query_vector = np.random.rand(2048).tolist()
+            query_vector = self._probe()
             results = self.db_manager.search_vectors(
                 collection_name="chaos_test",
                 query_vectors=[query_vector],
@@ -197,17 +252,15 @@ class ChaosEngineer:
         try:
             # Test with high memory usage
             print("   💾 Testing high memory usage...")
-            # Insert large batches
-            for i in range(10):  # Create 10 large batches
-                batch_data = self.db_manager.generate_test_data(100, prefix=f"memory_test_{i}")
-                self.db_manager.insert_data("chaos_test", batch_data)
-                print(f"   📊 Inserted batch {i+1}/10")
-                time.sleep(1)  # Small delay
+            # Insert one large batch in a single RPC
+            batch_data = self.db_manager.generate_test_data(1000, vector_dim=VECTOR_DIM, prefix="memory_test")
+            self.db_manager.insert_data("chaos_test", batch_data)
+            print(f"   📊 Inserted {len(batch_data)} records")
             
             print("   ✅ High memory usage test completed")
             
             # Test search under memory pressure
-            query_vector = np.random.rand(2048).tolist()
+            query_vector = self._probe()
             results = self.db_manager.search_vectors(
                 collection_name="chaos_test",
                 query_vectors=[query_vector],
@@ -244,13 +297,13 @@ class ChaosEngineer:
         
         # Test operations during network partition
         print("   🔍 Testing operations during network partition...")
-        try:
-            data = self.db_manager.generate_test_data(1, prefix="network_test_1")
-            self.db_manager.insert_data("chaos_test", data)
+        # Inserts go through Kafka, so they are the probe here; insert_data reports failure
+        # by returning False rather than raising
+        data = self.db_manager.generate_test_data(1, vector_dim=VECTOR_DIM, prefix="network_test_1")
+        if self.db_manager.insert_data("chaos_test", data, timeout=EXPECTED_FAILURE_TIMEOUT):
             print("   ⚠️ UNEXPECTED: Operations still working during network partition!")
-            
-        except Exception as e:
-            print(f"   ✅ EXPECTED: Operations failed during network partition: {e}")
+        else:
+            print("   ✅ EXPECTED: Operations failed during network partition")
         
         # Restart Kafka
         print("   🔄 Restarting Kafka...")
@@ -263,7 +316,7 @@ class ChaosEngineer:
         # Test operations after network recovery
         print("   🔍 Testing operations after network recovery...")
         try:
-            data = self.db_manager.generate_test_data(1, prefix="network_test_2")
+            data = self.db_manager.generate_test_data(1, vector_dim=VECTOR_DIM, prefix="network_test_2")
             self.db_manager.insert_data("chaos_test", data)
             print("   ✅ Operations working after network recovery")
             
@@ -297,14 +350,14 @@ class ChaosEngineer:
             ]
             
             for i, skewed_time in enumerate(skewed_times):
-                data = self.db_manager.generate_test_data(1, prefix=f"clock_skew_{i}")
+                data = self.db_manager.generate_test_data(1, vector_dim=VECTOR_DIM, prefix=f"clock_skew_{i}")
                 # Override timestamp
                 data[0]["timestamp"] = skewed_time
                 self.db_manager.insert_data("chaos_test", data)
                 print(f"   📊 Inserted record with timestamp: {skewed_time}")
             
             # Test search with clock skew
-            query_vector = np.random.rand(2048).tolist()
+            query_vector = self._probe()
             results = self.db_manager.search_vectors(
                 collection_name="chaos_test",
                 query_vectors=[query_vector],
@@ -324,9 +377,9 @@ class ChaosEngineer:
     
     def run_chaos_suite(self):
         """Run complete chaos engineering test suite"""
-        print("="*60)
+        print(BANNER)
         print("CHAOS ENGINEERING TEST SUITE")
-        print("="*60)
+        print(BANNER)
         
         # Setup
         if not self.setup_chaos_collection():
@@ -352,9 +405,9 @@ class ChaosEngineer:
                 results[test_name] = False
         
         # Summary
-        print("\n" + "="*60)
+        print("\n" + BANNER)
         print("CHAOS ENGINEERING TEST SUMMARY")
-        print("="*60)
+        print(BANNER)
         
         passed = sum(results.values())
         total = len(results)
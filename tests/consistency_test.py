@@ -6,21 +6,22 @@ Tests data integrity and consistency across distributed components
 
 import time
 import numpy as np
-import threading
 import concurrent.futures
 from typing import List, Dict, Tuple, Set
 from pymilvus import MilvusClient, DataType
-from docker_utils import DockerManager
+from docker_utils import get_docker_manager
 from database_utils import DatabaseManager
 import json
 
+DATA_NODES = ["milvus-datanode1", "milvus-datanode2"]
+
 class ConsistencyTester:
     """Data consistency testing suite for distributed Milvus"""
     
     def __init__(self, uri: str = "http://localhost:19530"):
         # Ensure Docker containers are running before starting tests
         self.db_manager = DatabaseManager(uri, ensure_docker_running=True)
-        self.docker_manager = DockerManager()
+        self.docker_manager = get_docker_manager()
         self.results = {}
         
     def setup_consistency_collection(self, collection_name: str = "consistency_test"):
@@ -31,7 +32,7 @@ class ConsistencyTester:
         """Calculate checksum for data integrity verification"""
         return self.db_manager.calculate_checksum(data)
     
-    def test_data_integrity(self, num_records: int = 100):
+    def test_data_integrity(self, num_records: int = 100, collection_name: str = "consistency_test"):
         """Test data integrity during insert and search operations"""
         print(f"\n🧪 Testing Data Integrity: {num_records} records")
         
@@ -40,12 +41,12 @@ class ConsistencyTester:
             inserted_data = self.db_manager.generate_consistency_test_data(num_records)
             
             # Insert data
-            self.db_manager.insert_data("consistency_test", inserted_data)
-            time.sleep(2)  # Wait for insertion
+            self.db_manager.insert_data(collection_name, inserted_data)
+            self.db_manager.flush_collection(collection_name)
             
             # Verify data integrity
             print("   🔍 Verifying data integrity...")
-            total_records, integrity_errors = self.db_manager.verify_data_integrity("consistency_test", inserted_data)
+            total_records, integrity_errors = self.db_manager.verify_data_integrity(collection_name, inserted_data)
             
             integrity_rate = (total_records - integrity_errors) / total_records if total_records > 0 else 0
             
@@ -62,7 +63,7 @@ class ConsistencyTester:
             print(f"❌ Data integrity test failed: {e}")
             return False
     
-    def test_replica_consistency(self):
+    def test_replica_consistency(self, collection_name: str = "consistency_test"):
         """Test data consistency across replica nodes without failover"""
         print(f"\n🧪 Testing Replica Consistency")
         
@@ -70,25 +71,30 @@ class ConsistencyTester:
             # Insert test data with multiple records
             test_data = self.db_manager.generate_consistency_test_data(10, prefix="replica_test")
             
-            self.db_manager.insert_data("consistency_test", test_data)
-            time.sleep(3)  # Wait for replication
+            self.db_manager.insert_data(collection_name, test_data)
+            self.db_manager.flush_collection(collection_name)
             
             # Test search consistency across replicas
             print("   🔍 Testing search consistency across replicas...")
-            query_vector = np.random.rand(2048).tolist()
+            num_searches = 5
+            query_vectors = np.random.default_rng().random((num_searches, 2048), dtype=np.float32)
             
-            # Perform multiple searches to test consistency
+            # Send all query vectors in one nq=5 request; results come back per query.
+            # Checksums of already-flushed records don't need a fresh read timestamp,
+            # so skip the Bounded/Strong wait on the query nodes
             consistency_errors = 0
             search_results = []
+            all_results = self.db_manager.search_vectors_per_query(
+                collection_name=collection_name,
+                query_vectors=list(query_vectors),
+                limit=10,
+                output_fields=["id", "label", "timestamp", "checksum"],
+                consistency_level="Eventually"
+            )
+            if len(all_results) < num_searches:
+                all_results = [[]] * num_searches  # The batched search failed outright
             
-            for i in range(5):  # Multiple searches
-                results = self.db_manager.search_vectors(
-                    collection_name="consistency_test",
-                    query_vectors=[query_vector],
-                    limit=10,
-                    output_fields=["id", "label", "timestamp", "checksum"]
-                )
-                
+            for i, results in enumerate(all_results):
                 if results:
                     search_results.append(results)
                 else:
@@ -96,12 +102,13 @@ class ConsistencyTester:
                     print(f"   ❌ Search {i+1} returned no results")
             
             # Verify data consistency in search results
+            test_index = {d['id']: d for d in test_data}
             for i, results in enumerate(search_results):
                 for hit in results:
                     record_id = hit.get('id')
                     if record_id and record_id.startswith('replica_test_'):
                         # Find original data
-                        original_data = next((d for d in test_data if d['id'] == record_id), None)
+                        original_data = test_index.get(record_id)
                         if original_data:
                             # Verify checksum
                             actual_checksum = hit.get('checksum')
@@ -118,20 +125,17 @@ class ConsistencyTester:
             
             # Verify all inserted data can be queried
             print("   🔍 Verifying all data can be queried...")
-            queried_data = self.db_manager.query_data(
-                collection_name="consistency_test",
-                filter_expr="id like 'replica_test_%'",
-                output_fields=["id", "label", "timestamp", "checksum"],
-                limit=100
-            )
-            
             data_consistency_errors = 0
-            for record in queried_data:
-                expected_checksum = self.db_manager.calculate_checksum(record)
-                actual_checksum = record.get('checksum', '')
-                
-                if expected_checksum != actual_checksum:
-                    data_consistency_errors += 1
+            records_verified = 0
+            expected = {d['id']: d['checksum'] for d in test_data}
+            for batch in self.db_manager.query_iterator(
+                collection_name=collection_name,
+                filter_expr='test_tag == "replica_test"',
+                output_fields=["id", "checksum"],
+                consistency_level="Eventually"
+            ):
+                records_verified += len(batch)
+                data_consistency_errors += len(self.db_manager.find_checksum_mismatches(batch, expected))
             
             total_errors = consistency_errors + data_consistency_errors
             
@@ -140,78 +144,92 @@ class ConsistencyTester:
                 'data_consistency_errors': data_consistency_errors,
                 'total_errors': total_errors,
                 'searches_performed': len(search_results),
-                'records_verified': len(queried_data)
+                'records_verified': records_verified
             }
             
-            print(f"✅ Replica Consistency: {total_errors} total errors ({len(search_results)} searches, {len(queried_data)} records)")
+            print(f"✅ Replica Consistency: {total_errors} total errors ({len(search_results)} searches, {records_verified} records)")
             return total_errors == 0
             
         except Exception as e:
             print(f"❌ Replica consistency test failed: {e}")
             return False
     
-    def test_concurrent_consistency(self, num_threads: int = 5, operations_per_thread: int = 20):
+    def test_concurrent_consistency(self, num_threads: int = 5, operations_per_thread: int = 20,
+                                    collection_name: str = "consistency_test"):
         """Test data consistency under concurrent operations"""
         print(f"\n🧪 Testing Concurrent Consistency: {num_threads} threads")
         
-        shared_data = []
-        consistency_errors = 0
-        lock = threading.Lock()
+        # Draw every record and query vector up front; threads take row slices
+        rng = np.random.default_rng()
+        total_ops = num_threads * operations_per_thread
+        all_vectors = rng.random((total_ops, 2048), dtype=np.float32)
+        all_queries = rng.random((total_ops, 2048), dtype=np.float32)
         
-        def worker_thread(thread_id: int):
-            nonlocal consistency_errors
+        def worker_thread(thread_id: int) -> Tuple[List[Dict], List[Dict], int]:
+            # Everything is accumulated per thread and merged once all workers are done
+            errors = 0
+            hits = []
+            
+            offset = thread_id * operations_per_thread
+            vectors = all_vectors[offset:offset + operations_per_thread]
+            queries = all_queries[offset:offset + operations_per_thread]
+            
+            # Pre-generate this thread's records and checksum them in one pass;
+            # per-thread invariants are computed once rather than per record
+            label_base = thread_id * 1000
+            timestamp = time.time()
+            records = [{
+                "id": f"concurrent_{thread_id}_{i}",
+                "vector": vectors[i],
+                "label": label_base + i,
+                "timestamp": timestamp,
+                "checksum": "",
+                "test_tag": "concurrent"
+            } for i in range(operations_per_thread)]
+            for data, checksum in zip(records, self.db_manager.calculate_checksums_batch(records)):
+                data["checksum"] = checksum
+            
+            # Insert all of this thread's records in one RPC
+            try:
+                self.db_manager.insert_data(collection_name, records)
+            except Exception as e:
+                print(f"   ❌ Thread {thread_id} insert error: {e}")
+                return [], [], len(records)
             
-            for i in range(operations_per_thread):
+            for query_vector in queries:
                 try:
-                    # Insert operation
-                    data = {
-                        "id": f"concurrent_{thread_id}_{i}",
-                        "vector": np.random.rand(2048).tolist(),
-                        "label": thread_id * 1000 + i,
-                        "timestamp": time.time(),
-                        "checksum": ""
-                    }
-                    data["checksum"] = self.calculate_checksum(data)
-                    
-                    self.db_manager.insert_data("consistency_test", [data])
-                    
-                    # Store for verification
-                    with lock:
-                        shared_data.append(data)
-                    
-                    # Search operation
-                    query_vector = np.random.rand(2048).tolist()
-                    results = self.db_manager.search_vectors(
-                        collection_name="consistency_test",
+                    # Search operation; hits are verified after the merge
+                    hits.extend(self.db_manager.search_vectors(
+                        collection_name=collection_name,
                         query_vectors=[query_vector],
                         limit=5,
-                        output_fields=["id", "label", "checksum"]
-                    )
-                    
-                    # Verify search results
-                    if results:
-                        for hit in results:
-                            hit_id = hit.get('id')
-                            hit_checksum = hit.get('checksum')
-                            
-                            # Find original data
-                            original_data = next((d for d in shared_data if d['id'] == hit_id), None)
-                            if original_data and original_data['checksum'] != hit_checksum:
-                                with lock:
-                                    consistency_errors += 1
-                                    print(f"   ❌ Concurrent consistency error: {hit_id}")
-                    
+                        output_fields=["id", "label", "checksum"],
+                        consistency_level="Eventually"  # Only hit checksums are verified
+                    ))
                 except Exception as e:
-                    with lock:
-                        consistency_errors += 1
-                        print(f"   ❌ Thread {thread_id} error: {e}")
+                    errors += 1
+                    print(f"   ❌ Thread {thread_id} error: {e}")
             
-            return True
+            return records, hits, errors
         
         try:
             with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
-                futures = [executor.submit(worker_thread, i) for i in range(num_threads)]
-                concurrent.futures.wait(futures)
+                worker_results = list(executor.map(worker_thread, range(num_threads)))
+            
+            # Merge per-thread results, then verify every search hit against all inserted records
+            shared_index: Dict[str, Dict] = {}
+            consistency_errors = 0
+            for records, _, errors in worker_results:
+                shared_index.update((data['id'], data) for data in records)
+                consistency_errors += errors
+            
+            for _, hits, _ in worker_results:
+                for hit in hits:
+                    hit_id = hit.get('id')
+                    original_data = shared_index.get(hit_id)
+                    if original_data and original_data['checksum'] != hit.get('checksum'):
+                        consistency_errors += 1
+                        print(f"   ❌ Concurrent consistency error: {hit_id}")
             
             self.results['concurrent_consistency'] = {
                 'threads': num_threads,
@@ -228,7 +246,7 @@ class ConsistencyTester:
             print(f"❌ Concurrent consistency test failed: {e}")
             return False
     
-    def test_transaction_atomicity(self):
+    def test_transaction_atomicity(self, collection_name: str = "consistency_test"):
         """Test transaction atomicity and rollback behavior"""
         print(f"\n🧪 Testing Transaction Atomicity")
         
@@ -238,37 +256,33 @@ class ConsistencyTester:
             batch_data = self.db_manager.generate_consistency_test_data(10, prefix="atomic_test")
             
             # Insert batch
-            self.db_manager.insert_data("consistency_test", batch_data)
-            time.sleep(2)
+            self.db_manager.insert_data(collection_name, batch_data)
+            self.db_manager.flush_collection(collection_name)
             
-            # Verify all records are present
-            all_data = self.db_manager.query_data(
-                collection_name="consistency_test",
-                filter_expr="id like 'atomic_test_%'",
-                output_fields=["id", "label", "timestamp", "checksum"],
-                limit=100
-            )
+            # Count the records that came back and check their checksums in the same pass
+            records_found = 0
+            consistency_errors = 0
+            expected = {d['id']: d['checksum'] for d in batch_data}
+            for batch in self.db_manager.query_iterator(
+                collection_name=collection_name,
+                filter_expr='test_tag == "atomic_test"',
+                output_fields=["id", "checksum"]
+            ):
+                records_found += len(batch)
+                consistency_errors += len(self.db_manager.find_checksum_mismatches(batch, expected))
             
-            atomicity_success = len(all_data) == len(batch_data)
+            # Verify all records are present
+            atomicity_success = records_found == len(batch_data)
             
             if atomicity_success:
                 print("   ✅ Batch insert atomicity verified")
             else:
-                print(f"   ❌ Batch insert atomicity failed: {len(all_data)}/{len(batch_data)} records")
-            
-            # Test data consistency in batch
-            consistency_errors = 0
-            for record in all_data:
-                expected_checksum = self.db_manager.calculate_checksum(record)
-                actual_checksum = record.get('checksum', '')
-                
-                if expected_checksum != actual_checksum:
-                    consistency_errors += 1
+                print(f"   ❌ Batch insert atomicity failed: {records_found}/{len(batch_data)} records")
             
             self.results['transaction_atomicity'] = {
                 'batch_insert_successful': atomicity_success,
                 'consistency_errors': consistency_errors,
-                'atomicity_rate': 1 - (consistency_errors / len(all_data)) if all_data else 0
+                'atomicity_rate': 1 - (consistency_errors / records_found) if records_found else 0
             }
             
             atomicity_rate = self.results['transaction_atomicity']['atomicity_rate']
@@ -279,7 +293,7 @@ class ConsistencyTester:
             print(f"❌ Transaction atomicity test failed: {e}")
             return False
     
-    def test_data_loss_detection(self):
+    def test_data_loss_detection(self, collection_name: str = "consistency_test"):
         """Test data loss detection and recovery"""
         print(f"\n🧪 Testing Data Loss Detection")
         
@@ -287,46 +301,44 @@ class ConsistencyTester:
             # Insert test data
             test_data = self.db_manager.generate_consistency_test_data(50, prefix="loss_test")
             
-            self.db_manager.insert_data("consistency_test", test_data)
-            time.sleep(3)
+            # Streaming insert and no flush here: unflushed data must be recovered from
+            # the log broker. A bulk import would land in object storage and skip Kafka entirely
+            self.db_manager.insert_data(collection_name, test_data)
             
             # Simulate data loss by stopping and restarting services
             print("   🛑 Stopping and restarting services...")
             
-            # Stop data nodes
-            self.docker_manager.stop_container("milvus-datanode1")
-            self.docker_manager.stop_container("milvus-datanode2")
-            time.sleep(5)
+            # Stop both data nodes together so they go down as one outage
+            self.docker_manager.stop_containers(DATA_NODES)
+            time.sleep(5)  # Keep the data nodes down for a short outage window
             
-            # Restart data nodes
-            self.docker_manager.start_container("milvus-datanode1")
-            self.docker_manager.start_container("milvus-datanode2")
-            time.sleep(10)  # Wait for recovery
+            # Restart data nodes together; they recover concurrently
+            self.docker_manager.start_containers(DATA_NODES)
+            # Wait for recovery
+            if not self.db_manager.wait_for_collection_serving(collection_name):
+                print(f"   ⚠️ {collection_name} not serving after restarting the data nodes")
             
             # Check for data loss
             print("   🔍 Checking for data loss...")
-            recovered_data = self.db_manager.query_data(
-                collection_name="consistency_test",
-                filter_expr="id like 'loss_test_%'",
-                output_fields=["id", "label", "checksum"],
-                limit=100
-            )
-            
-            data_loss = len(test_data) - len(recovered_data)
-            data_loss_rate = data_loss / len(test_data) if test_data else 0
-            
-            # Verify data integrity of recovered data
+            # Count recovered records and verify their integrity in the same pass
+            recovered_records = 0
             integrity_errors = 0
-            for record in recovered_data:
-                expected_checksum = self.db_manager.calculate_checksum(record)
-                actual_checksum = record.get('checksum', '')
-                
-                if expected_checksum != actual_checksum:
-                    integrity_errors += 1
+            expected = {d['id']: d['checksum'] for d in test_data}
+            for batch in self.db_manager.query_iterator(
+                collection_name=collection_name,
+                filter_expr='test_tag == "loss_test"',
+                output_fields=["id", "checksum"],
+                consistency_level="Strong"  # Recovery is judged on this read; it must see every write
+            ):
+                recovered_records += len(batch)
+                integrity_errors += len(self.db_manager.find_checksum_mismatches(batch, expected))
+            
+            data_loss = len(test_data) - recovered_records
+            data_loss_rate = data_loss / len(test_data) if test_data else 0
             
             self.results['data_loss_detection'] = {
                 'original_records': len(test_data),
-                'recovered_records': len(recovered_data),
+                'recovered_records': recovered_records,
                 'data_loss': data_loss,
                 'data_loss_rate': data_loss_rate,
                 'integrity_errors': integrity_errors,
@@ -346,28 +358,39 @@ class ConsistencyTester:
         print("DATA CONSISTENCY TEST SUITE")
         print("="*60)
         
-        # Setup
-        if not self.setup_consistency_collection():
-            return False
+        # Independent tests each get their own collection so they can run concurrently
+        parallel_tests = [
+            ("Data Integrity", "consistency_test_integrity", self.test_data_integrity),
+            ("Replica Consistency", "consistency_test_replica", self.test_replica_consistency),
+            ("Concurrent Consistency", "consistency_test_concurrent", self.test_concurrent_consistency),
+            ("Transaction Atomicity", "consistency_test_atomicity", self.test_transaction_atomicity)
+        ]
         
-        # Run tests
-        tests = [
-            ("Data Integrity", self.test_data_integrity),
-            ("Replica Consistency", self.test_replica_consistency),
-            ("Concurrent Consistency", self.test_concurrent_consistency),
-            ("Transaction Atomicity", self.test_transaction_atomicity),
-            ("Data Loss Detection", self.test_data_loss_detection)
+        # Data loss detection stops the data nodes, so it runs alone afterwards
+        serial_tests = [
+            ("Data Loss Detection", "consistency_test", self.test_data_loss_detection)
         ]
         
-        results = {}
-        for test_name, test_func in tests:
+        def run_test(test_name: str, collection_name: str, test_func) -> bool:
             print(f"\n🧪 Running {test_name}...")
             try:
-                success = test_func()
-                results[test_name] = success
+                if not self.setup_consistency_collection(collection_name):
+                    print(f"❌ {test_name} setup failed")
+                    return False
+                return test_func(collection_name=collection_name)
             except Exception as e:
                 print(f"❌ {test_name} failed: {e}")
-                results[test_name] = False
+                return False
+        
+        results = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(parallel_tests)) as executor:
+            futures = {test_name: executor.submit(run_test, test_name, collection_name, test_func)
+                       for test_name, collection_name, test_func in parallel_tests}
+            for test_name, future in futures.items():
+                results[test_name] = future.result()
+        
+        for test_name, collection_name, test_func in serial_tests:
+            results[test_name] = run_test(test_name, collection_name, test_func)
         
         # Summary
         print("\n" + "="*60)
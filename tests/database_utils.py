@@ -4,33 +4,357 @@ Database Utilities for Milvus Operations
 Centralized database operations for reusability across test suites
 """
 
+import os
 import time
+import queue
+import atexit
+import threading
 import numpy as np
+import json
+import struct
+import socket
 import hashlib
 import logging
 import subprocess
 import requests
-from typing import List, Dict, Optional, Tuple, Any
-from pymilvus import MilvusClient, DataType, Collection, connections
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from types import MappingProxyType
+from urllib.parse import urlsplit
+from typing import List, Dict, FrozenSet, Optional, Set, Tuple, Any, Iterator
+from pymilvus import MilvusClient, DataType, Collection, connections, LoadState
+from docker_utils import CONTAINER_STATE_TTL, DOCKER_BIN, get_docker_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Shared manager reused by the convenience functions below
+_SHARED_MANAGER = None
+
+# Deadline (seconds) for calls that are expected to fail, so they don't sit in client retries
+EXPECTED_FAILURE_TIMEOUT = 2
+
+# Seconds a stopped node's etcd session outlives it (Milvus common.session.ttl), i.e. how
+# long coordinators may keep routing to it before noticing it is gone
+NODE_SESSION_TTL = 30
+
+# Binary record header hashed by calculate_checksums_batch: label, timestamp, id length
+_CHECKSUM_HEADER = struct.Struct('<qdI')
+
+# 128-bit record digest: BLAKE3 when the optional blake3 package is installed, else BLAKE2b
+try:
+    from blake3 import blake3 as _blake3
+    
+    def _record_digest(payload: bytes) -> str:
+        return _blake3(payload).hexdigest(length=16)
+except ImportError:
+    def _record_digest(payload: bytes) -> str:
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+# Max ids per 'id in [...]' expression, to stay under Milvus expression size limits
+ID_QUERY_BATCH_SIZE = 1000
+
+# Below this many ids, plain f-strings beat building them with np.char
+VECTORIZED_ID_MIN = 32
+
+# Default probe vector for quick_search_test, allocated once as float32
+_QUICK_QUERY_VECTOR = np.full(2048, 0.1, dtype=np.float32)
+
+# Read-only stand-in for hits without an 'entity', so _hit_to_match allocates no empty dict per hit
+_NO_ENTITY = MappingProxyType({})
+
+def get_running_milvus_containers(max_age: float = CONTAINER_STATE_TTL) -> FrozenSet[str]:
+    """
+    Names of running Milvus containers, from the shared DockerManager's container snapshot
+    
+    Using the DockerManager's cache (rather than a separate one) means its start/stop/restart
+    calls invalidate what this returns.
+    
+    Args:
+        max_age: Reuse a snapshot up to this old (seconds, 0 forces a fresh check)
+    
+    Returns:
+        Frozen set of running milvus-* container names
+    
+    Raises:
+        RuntimeError: If docker cannot be queried
+    """
+    running = get_docker_manager().get_running_containers(max_age)
+    return frozenset(name for name in running if name.startswith('milvus-'))
+
+def _hit_to_match(hit, fields: Tuple[str, ...]) -> Dict:
+    """
+    Flatten one search hit into a match dict
+    
+    Args:
+        hit: Search hit as a dict with 'distance' and optional 'entity'
+        fields: Output fields to copy into the match
+    
+    Returns:
+        Match with 'similarity' plus each field found (entity values win over top-level hit keys)
+    """
+    entity = hit.get('entity') or _NO_ENTITY
+    match = {'similarity': hit.get('distance', 0.0)}
+    for field in fields:
+        if field in entity:
+            match[field] = entity[field]
+        elif field in hit:
+            match[field] = hit[field]
+    return match
+
+def _milvus_tcp_ready(uri: str, timeout: float = 0.5) -> bool:
+    """
+    Check whether the Milvus gRPC port accepts TCP connections
+    
+    Args:
+        uri: Milvus uri, e.g. "http://localhost:19530"
+        timeout: Connect timeout (seconds)
+    
+    Returns:
+        bool: True if the port accepted a connection, False otherwise
+    """
+    parts = urlsplit(uri)
+    try:
+        with socket.create_connection((parts.hostname or 'localhost', parts.port or 19530), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+def _wait_for_start_events(events: subprocess.Popen, needed: Set[str], timeout: float) -> Set[str]:
+    """
+    Collect container names from a `docker events` start stream until all are seen
+    
+    Args:
+        events: Running `docker events` process printing one container name per line
+        needed: Container names to wait for
+        timeout: Maximum time to wait (seconds)
+    
+    Returns:
+        Set of container names whose start event arrived (may be partial on timeout)
+    """
+    lines: "queue.Queue[Optional[str]]" = queue.Queue()
+    
+    def reader():
+        for line in events.stdout:
+            lines.put(line.strip())
+        lines.put(None)  # Stream closed
+    
+    threading.Thread(target=reader, daemon=True).start()
+    
+    seen = set()
+    deadline = time.monotonic() + timeout
+    while not needed <= seen:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            name = lines.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if name is None:
+            break
+        seen.add(name)
+    return seen & needed
+
+def _make_ids(prefix: str, count: int) -> List[str]:
+    """Build "<prefix>_<i>" record ids for i in range(count) with one vectorized string op"""
+    if count < VECTORIZED_ID_MIN:
+        # np.char setup costs more than formatting a handful of ids directly
+        return [f"{prefix}_{i}" for i in range(count)]
+    return np.char.add(f"{prefix}_", np.arange(count).astype(str)).tolist()
+
+def _poll_until(predicate, timeout: float, initial: float = 0.1, factor: float = 1.5,
+                max_interval: float = 2.0) -> bool:
+    """
+    Poll a readiness check with exponential backoff instead of sleeping blindly
+    
+    Args:
+        predicate: Zero-argument callable returning True once ready (exceptions count as not ready)
+        timeout: Maximum time to wait (seconds)
+        initial: First delay between polls (seconds)
+        factor: Multiplier applied to the delay after each poll
+        max_interval: Upper bound on the delay between polls (seconds)
+    
+    Returns:
+        bool: True if the predicate succeeded, False on timeout
+    """
+    deadline = time.monotonic() + timeout
+    interval = initial
+    while True:
+        try:
+            if predicate():
+                return True
+        except Exception as e:
+            logger.debug(f"Readiness check failed: {e}")
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+        interval = min(interval * factor, max_interval)
+
+# Max MilvusClient channels per manager for concurrent search/query/insert
+MILVUS_POOL_SIZE = int(os.getenv('MILVUS_POOL_SIZE', '8'))
+
+class MilvusClientPool:
+    """
+    Fixed-size pool of MilvusClient instances for concurrent data-plane calls
+    
+    Clients are created lazily, so single-threaded use never opens more than the
+    seed client; threads beyond the pool size block until a client is returned.
+    """
+    
+    def __init__(self, uri: str, database_name: str, size: int = MILVUS_POOL_SIZE,
+                 seed_client: Optional[MilvusClient] = None):
+        self.uri = uri
+        self.database_name = database_name
+        self.size = max(size, 1)
+        self._idle: "queue.Queue[Optional[MilvusClient]]" = queue.Queue()  # None = closed sentinel
+        self._owned: List[MilvusClient] = []
+        self._created = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        
+        # The manager's own client is reused as the first pool slot and never closed here
+        if seed_client is not None:
+            self._idle.put(seed_client)
+            self._created = 1
+    
+    def _new_client(self) -> MilvusClient:
+        client = MilvusClient(uri=self.uri, timeout=30)
+        try:
+            client.using_database(self.database_name)
+        except Exception as e:
+            logger.warning(f"Database {self.database_name} may not exist: {e}")
+        return client
+    
+    @contextmanager
+    def acquire(self):
+        """
+        Borrow a client for the duration of a with-block
+        
+        Raises:
+            RuntimeError: If the pool has been closed
+        """
+        if self._closed:
+            raise RuntimeError("Milvus client pool is closed")
+        try:
+            client = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = self._created < self.size
+                if grow:
+                    self._created += 1
+            if grow:
+                try:
+                    client = self._new_client()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+                with self._lock:
+                    self._owned.append(client)
+            else:
+                client = self._idle.get()
+        if client is None:
+            # Closed while waiting; pass the sentinel on to the next waiter
+            self._idle.put(None)
+            raise RuntimeError("Milvus client pool is closed")
+        try:
+            yield client
+        finally:
+            # A client returned after close() is dropped, never handed out again
+            if not self._closed:
+                self._idle.put(client)
+    
+    def close(self):
+        """
+        Close the clients this pool opened (the seed client is left to its owner)
+        
+        Idle clients are drained and later acquire() calls raise, so no caller can
+        borrow a closed channel; clients still borrowed are dropped when returned.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            owned, self._owned = self._owned, []
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        # Wakes any thread blocked waiting for a free client
+        self._idle.put(None)
+        for client in owned:
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled Milvus client: {e}")
+
 class DatabaseManager:
     """Centralized database operations manager for Milvus"""
     
+    # One MilvusClient (gRPC channel) per (uri, database), shared by every manager in the process
+    _shared_clients: Dict[Tuple[str, str], MilvusClient] = {}
+    _shared_clients_lock = threading.Lock()
+    
     def __init__(self, uri: str = "http://localhost:19530", database_name: str = "test_db", ensure_docker_running: bool = True):
         """Initialize database manager"""
         self.uri = uri
         self.database_name = database_name
-        self.client = None
+        self.ensure_docker_running = ensure_docker_running
+        self._orm_alias = None  # Opened lazily by get_replica_info / search_vectors_orm
+        self._orm_collections: Dict[str, Collection] = {}  # ORM handles for search_vectors_orm
+        self._schema_cache: Dict[str, Any] = {}  # Built schemas keyed by serialized schema_config
+        self._created_collections: Set[str] = set()  # Known to exist; skips has_collection probes
         
-        if ensure_docker_running:
-            self._ensure_docker_containers_running()
+        # Docker checks and the Milvus connection happen on first use of client/pool,
+        # so callers that only generate data or checksums never touch Docker or the network
+        self._client: Optional[MilvusClient] = None
+        self._pool: Optional[MilvusClientPool] = None
+        self._lazy_lock = threading.RLock()
+    
+    @property
+    def client(self) -> MilvusClient:
+        """Milvus client, verifying Docker (if requested) and connecting on first access"""
+        if self._client is None:
+            with self._lazy_lock:
+                if self._client is None:
+                    if self.ensure_docker_running:
+                        self._ensure_docker_containers_running()
+                    self._client = self._connect()
+        return self._client
+    
+    @property
+    def pool(self) -> MilvusClientPool:
+        """Client pool for concurrent data-plane calls, seeded with the shared client"""
+        if self._pool is None:
+            with self._lazy_lock:
+                if self._pool is None:
+                    pool = MilvusClientPool(self.uri, self.database_name, seed_client=self.client)
+                    atexit.register(pool.close)
+                    self._pool = pool
+        return self._pool
+    
+    def connect(self, recheck_containers: bool = True) -> MilvusClient:
+        """
+        Connect now instead of on first use
+        
+        The first call runs the Docker check (if ensure_docker_running) and connects;
+        later calls keep the existing connection and only repeat the container check.
+        
+        Args:
+            recheck_containers: Repeat the container check when already connected
         
-        self._connect()
-        self._ensure_database()
+        Returns:
+            The connected MilvusClient
+        """
+        with self._lazy_lock:
+            if self._client is not None and recheck_containers and self.ensure_docker_running:
+                self._ensure_docker_containers_running()
+            return self.client
     
     def _ensure_docker_containers_running(self):
         """Ensure all required Docker containers are running"""
@@ -54,56 +378,66 @@ class DatabaseManager:
         
         logger.info("🔍 Checking Docker container status...")
         
-        # Get running containers
+        # Every required container that is not running needs a start, whatever its state
+        # (exited, created, paused, dead, restarting, or missing entirely); the snapshot is
+        # the shared DockerManager's, so a recent check (e.g. the runner's) is reused
         try:
-            result = subprocess.run(['docker', 'ps', '--format', '{{.Names}}'], 
-                                  capture_output=True, text=True, check=True)
-            running_containers = set(result.stdout.strip().split('\n'))
-        except subprocess.CalledProcessError as e:
+            running_containers = get_running_milvus_containers()
+        except RuntimeError as e:
             logger.error(f"❌ Failed to check Docker containers: {e}")
             raise
         
-        # Check which containers need to be started
-        stopped_containers = []
-        for container in required_containers:
-            if container not in running_containers:
-                stopped_containers.append(container)
+        stopped_containers = [c for c in required_containers if c not in running_containers]
         
         if stopped_containers:
             logger.warning(f"⚠️ Found {len(stopped_containers)} stopped containers: {stopped_containers}")
             logger.info("🔄 Starting stopped containers...")
             
-            # Start stopped containers
-            for container in stopped_containers:
-                try:
-                    logger.info(f"   Starting {container}...")
-                    result = subprocess.run(['docker', 'start', container], 
-                                          capture_output=True, text=True, check=True)
-                    logger.info(f"   ✅ {container} started")
-                except subprocess.CalledProcessError as e:
-                    logger.error(f"   ❌ Failed to start {container}: {e}")
-                    raise
+            def start(container: str):
+                logger.info(f"   Starting {container}...")
+                subprocess.run([DOCKER_BIN, 'start', container], 
+                               capture_output=True, text=True, check=True)
+                return container
             
-            # Wait for containers to be ready
-            logger.info("⏱️ Waiting for containers to be ready...")
-            time.sleep(10)
-            
-            # Verify containers are running
+            # Subscribe to start events before issuing any start so none can be missed
+            events = subprocess.Popen(
+                [DOCKER_BIN, 'events', '--filter', 'type=container', '--filter', 'event=start',
+                 '--format', '{{.Actor.Attributes.name}}'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            )
             try:
-                result = subprocess.run(['docker', 'ps', '--format', '{{.Names}}'], 
-                                      capture_output=True, text=True, check=True)
-                running_containers = set(result.stdout.strip().split('\n'))
-                
-                still_stopped = [c for c in stopped_containers if c not in running_containers]
-                if still_stopped:
-                    logger.error(f"❌ Some containers failed to start: {still_stopped}")
-                    raise Exception(f"Failed to start containers: {still_stopped}")
+                # Start stopped containers concurrently; wall time is the slowest start, not the sum
+                with ThreadPoolExecutor(max_workers=len(stopped_containers)) as executor:
+                    futures = {executor.submit(start, container): container for container in stopped_containers}
+                    for future in as_completed(futures):
+                        container = futures[future]
+                        try:
+                            future.result()
+                            logger.info(f"   ✅ {container} started")
+                        except subprocess.CalledProcessError as e:
+                            # stderr says why, e.g. "No such container" or a paused container
+                            logger.error(f"   ❌ Failed to start {container}: {(e.stderr or '').strip() or e}")
+                            raise
                 
-                logger.info("✅ All required containers are now running")
-                
-            except subprocess.CalledProcessError as e:
-                logger.error(f"❌ Failed to verify container status: {e}")
-                raise
+                # Wait for containers to be ready by draining start events, not sleeping a fixed 10s
+                logger.info("⏱️ Waiting for containers to be ready...")
+                seen = _wait_for_start_events(events, set(stopped_containers), timeout=30)
+            finally:
+                events.terminate()
+                events.wait()
+                # Containers changed state; later checks must not reuse the pre-start snapshot
+                get_docker_manager().invalidate_state_cache()
+            
+            # Verify containers are running; only fall back to docker ps if an event never arrived
+            still_stopped = [c for c in stopped_containers if c not in seen]
+            if still_stopped:
+                running_containers = get_running_milvus_containers(max_age=0)
+                still_stopped = [c for c in still_stopped if c not in running_containers]
+            if still_stopped:
+                logger.error(f"❌ Some containers failed to start: {still_stopped}")
+                raise Exception(f"Failed to start containers: {still_stopped}")
+            
+            logger.info("✅ All required containers are now running")
         else:
             logger.info("✅ All required containers are already running")
         
@@ -116,9 +450,16 @@ class DatabaseManager:
         
         for attempt in range(max_attempts):
             try:
+                # A closed port fails in under a millisecond instead of a 5s client connect timeout
+                if not _milvus_tcp_ready(self.uri):
+                    raise ConnectionError(f"Milvus port not accepting connections at {self.uri}")
+                
                 # Try to connect to Milvus
                 test_client = MilvusClient(uri=self.uri, timeout=5)
-                databases = test_client.list_databases()
+                try:
+                    databases = test_client.list_databases()
+                finally:
+                    test_client.close()
                 logger.info("✅ Milvus is ready!")
                 return True
             except Exception as e:
@@ -129,26 +470,117 @@ class DatabaseManager:
                     logger.error(f"❌ Milvus failed to become ready after {max_attempts} attempts: {e}")
                     raise
         
-    def _connect(self):
-        """Connect to Milvus"""
+    def _connect(self) -> MilvusClient:
+        """Connect to Milvus, reusing the process-wide client for this uri and database"""
+        key = (self.uri, self.database_name)
+        with self._shared_clients_lock:
+            client = self._shared_clients.get(key)
+            if client is not None:
+                logger.info(f"Reusing Milvus connection to {self.uri}")
+                return client
+            
+            try:
+                # Configure client with reasonable timeout settings
+                client = MilvusClient(uri=self.uri, timeout=30)
+                logger.info(f"Connected to Milvus at {self.uri} with 30s timeout")
+            except Exception as e:
+                logger.error(f"Failed to connect: {e}")
+                raise
+            
+            self._ensure_database(client)
+            if not self._shared_clients:
+                atexit.register(DatabaseManager.close_shared_clients)
+            self._shared_clients[key] = client
+            return client
+    
+    def ensure_connection(self, timeout: float = 2) -> bool:
+        """
+        Ping Milvus and reconnect if the channel has gone stale
+        
+        Args:
+            timeout: Deadline for each health-check RPC (seconds)
+        
+        Returns:
+            bool: True if a working connection is available, False otherwise
+        """
+        try:
+            self.client.list_collections(timeout=timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Milvus connection check failed, reconnecting: {e}")
+        
+        # Swap in a fresh client and pool; the stale ones are not closed here because
+        # other threads may still hold them, and borrowed clients drain back into the
+        # abandoned pool, which its atexit hook closes
+        key = (self.uri, self.database_name)
+        with self._lazy_lock:
+            stale = self._client
+            with self._shared_clients_lock:
+                if self._shared_clients.get(key) is stale:
+                    del self._shared_clients[key]
+            try:
+                client = self._connect()
+            except Exception as e:
+                logger.error(f"❌ Failed to reconnect to Milvus: {e}")
+                return False
+            pool = MilvusClientPool(self.uri, self.database_name, seed_client=client)
+            atexit.register(pool.close)
+            self._client, self._pool = client, pool
+        
         try:
-            # Configure client with reasonable timeout settings
-            self.client = MilvusClient(uri=self.uri, timeout=30)
-            logger.info(f"Connected to Milvus at {self.uri} with 30s timeout")
+            client.list_collections(timeout=timeout)
+            logger.info(f"✅ Reconnected to Milvus at {self.uri}")
+            return True
         except Exception as e:
-            logger.error(f"Failed to connect: {e}")
-            raise
+            logger.error(f"❌ Failed to reconnect to Milvus: {e}")
+            return False
     
-    def _ensure_database(self):
+    def _ensure_database(self, client: MilvusClient):
         """Ensure database exists and is selected"""
         try:
-            self.client.using_database(self.database_name)
+            client.using_database(self.database_name)
             logger.info(f"Using database: {self.database_name}")
         except Exception as e:
             logger.warning(f"Database {self.database_name} may not exist: {e}")
     
+    def _build_schema(self, schema_config: Dict):
+        """Build a collection schema from a schema config, reusing one object per distinct config"""
+        key = json.dumps(schema_config, sort_keys=True, default=str)
+        schema = self._schema_cache.get(key)
+        if schema is not None:
+            return schema
+        
+        # Create schema
+        schema = self.client.create_schema(
+            auto_id=schema_config.get('auto_id', False),
+            enable_dynamic_field=schema_config.get('enable_dynamic_field', True)
+        )
+        
+        # Add fields to schema
+        for field_config in schema_config.get('fields', []):
+            # Extract parameters with defaults
+            field_name = field_config['name']
+            datatype = field_config['type']
+            max_length = field_config.get('max_length', None)
+            is_primary = field_config.get('is_primary', False)
+            is_partition_key = field_config.get('is_partition_key', False)
+            dim = field_config.get('dim', None)
+            
+            # Add field with positional arguments
+            if max_length is not None:
+                schema.add_field(field_name, datatype, max_length=max_length, is_primary=is_primary,
+                                 is_partition_key=is_partition_key)
+            elif dim is not None:
+                schema.add_field(field_name, datatype, dim=dim)
+            else:
+                schema.add_field(field_name, datatype)
+        
+        self._schema_cache[key] = schema
+        return schema
+    
     def create_collection(self, collection_name: str, schema_config: Dict = None, 
-                         index_config: Dict = None, replica_number: int = None) -> bool:
+                         index_config: Dict = None, replica_number: int = None,
+                         vector_dim: int = 2048) -> bool:
         """
         Create a collection with specified schema and index configuration
         
@@ -157,96 +589,94 @@ class DatabaseManager:
             schema_config: Schema configuration dict
             index_config: Index configuration dict  
             replica_number: Number of replicas (optional)
+            vector_dim: Vector dimension for the default schema (ignored if schema_config is given)
         
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            # Drop collection if exists
-            if self.client.has_collection(collection_name):
-                logger.info(f"Dropping existing collection: {collection_name}")
-                self.client.drop_collection(collection_name)
-                time.sleep(2)
-            
-            # Default schema configuration
-            if schema_config is None:
-                schema_config = {
-                    'auto_id': False,
-                    'enable_dynamic_field': True,
-                    'fields': [
-                        {'name': 'id', 'type': DataType.VARCHAR, 'max_length': 100, 'is_primary': True},
-                        {'name': 'vector', 'type': DataType.FLOAT_VECTOR, 'dim': 2048},
-                        {'name': 'label', 'type': DataType.INT64},
-                        {'name': 'timestamp', 'type': DataType.DOUBLE}
-                    ]
-                }
-            
-            # Create schema
-            schema = self.client.create_schema(
-                auto_id=schema_config.get('auto_id', False),
-                enable_dynamic_field=schema_config.get('enable_dynamic_field', True)
-            )
-            
-            # Add fields to schema
-            for field_config in schema_config.get('fields', []):
-                # Extract parameters with defaults
-                field_name = field_config['name']
-                datatype = field_config['type']
-                max_length = field_config.get('max_length', None)
-                is_primary = field_config.get('is_primary', False)
-                dim = field_config.get('dim', None)
-                
-                # Add field with positional arguments
-                if max_length is not None:
-                    schema.add_field(field_name, datatype, max_length=max_length, is_primary=is_primary)
-                elif dim is not None:
-                    schema.add_field(field_name, datatype, dim=dim)
-                else:
-                    schema.add_field(field_name, datatype)
-            
-            # Default index configuration
-            if index_config is None:
-                index_config = {
-                    'field_name': 'vector',
-                    'index_type': 'IVF_FLAT',
-                    'metric_type': 'L2',
-                    'params': {'nlist': 1024}
-                }
-            
-            # Create index parameters
-            index_params = self.client.prepare_index_params()
-            index_params.add_index(
-                field_name=index_config['field_name'],
-                index_type=index_config['index_type'],
-                metric_type=index_config['metric_type'],
-                params=index_config['params']
-            )
-            
-            # Create collection
-            self.client.create_collection(
-                collection_name=collection_name,
-                schema=schema,
-                index_params=index_params
-            )
-            
-            # Load collection
+        for attempt in range(2):
+            client = self._client
+            try:
+                self._create_collection(collection_name, schema_config, index_config,
+                                        replica_number, vector_dim)
+                return True
+            except Exception as e:
+                # Setup often follows a long idle stretch or container restarts; retry once
+                # only if the failure was a stale channel that ensure_connection replaced
+                if attempt == 0 and client is not None and self.ensure_connection() and self._client is not client:
+                    logger.warning(f"⚠️ Retrying collection creation after reconnect: {e}")
+                    continue
+                logger.error(f"❌ Failed to create collection: {e}")
+                return False
+    
+    def _create_collection(self, collection_name: str, schema_config: Optional[Dict],
+                           index_config: Optional[Dict], replica_number: Optional[int],
+                           vector_dim: int):
+        """Create and load a collection, raising on any failure"""
+        # Drop collection if exists; skip the has_collection round trip for
+        # collections this manager created itself
+        if collection_name in self._created_collections or self.client.has_collection(collection_name):
+            logger.info(f"Dropping existing collection: {collection_name}")
+            self.client.drop_collection(collection_name)
+            self._created_collections.discard(collection_name)
+            self._orm_collections.pop(collection_name, None)
+            time.sleep(2)
+        
+        # Default schema configuration
+        if schema_config is None:
+            schema_config = {
+                'auto_id': False,
+                'enable_dynamic_field': True,
+                'fields': [
+                    {'name': 'id', 'type': DataType.VARCHAR, 'max_length': 100, 'is_primary': True},
+                    {'name': 'vector', 'type': DataType.FLOAT_VECTOR, 'dim': vector_dim},
+                    {'name': 'label', 'type': DataType.INT64},
+                    {'name': 'timestamp', 'type': DataType.DOUBLE}
+                ]
+            }
+        
+        schema = self._build_schema(schema_config)
+        
+        # Default index configuration
+        if index_config is None:
+            index_config = {
+                'field_name': 'vector',
+                'index_type': 'IVF_FLAT',
+                'metric_type': 'L2',
+                'params': {'nlist': 1024}
+            }
+        
+        # Create index parameters
+        index_params = self.client.prepare_index_params()
+        index_params.add_index(
+            field_name=index_config['field_name'],
+            index_type=index_config['index_type'],
+            metric_type=index_config['metric_type'],
+            params=index_config['params']
+        )
+        
+        # Create collection
+        self.client.create_collection(
+            collection_name=collection_name,
+            schema=schema,
+            index_params=index_params
+        )
+        
+        self._created_collections.add(collection_name)
+        
+        # Load collection once, with the replica number if specified
+        if replica_number:
+            try:
+                self.client.load_collection(collection_name, replica_number=replica_number)
+                logger.info(f"Collection loaded with replica_number={replica_number}")
+            except Exception as e:
+                logger.warning(f"Failed to set replica_number: {e}")
+                self.client.load_collection(collection_name)
+        else:
             self.client.load_collection(collection_name)
-            
-            # Set replica number if specified
-            if replica_number:
-                try:
-                    self.client.load_collection(collection_name, replica_number=replica_number)
-                    logger.info(f"Collection loaded with replica_number={replica_number}")
-                except Exception as e:
-                    logger.warning(f"Failed to set replica_number: {e}")
-            
-            time.sleep(3)  # Wait for collection to be ready
-            logger.info(f"✅ Collection '{collection_name}' created successfully")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to create collection: {e}")
-            return False
+        
+        self.wait_for_collection_ready(collection_name)
+        logger.info(f"✅ Collection '{collection_name}' created successfully")
     
     def create_consistency_collection(self, collection_name: str = "consistency_test") -> bool:
         """Create collection specifically for consistency testing"""
@@ -258,7 +688,9 @@ class DatabaseManager:
                 {'name': 'vector', 'type': DataType.FLOAT_VECTOR, 'dim': 2048},
                 {'name': 'label', 'type': DataType.INT64},
                 {'name': 'timestamp', 'type': DataType.DOUBLE},
-                {'name': 'checksum', 'type': DataType.VARCHAR, 'max_length': 100}
+                {'name': 'checksum', 'type': DataType.VARCHAR, 'max_length': 100},
+                # Partition key so per-test reads filter by equality and touch only their own partition
+                {'name': 'test_tag', 'type': DataType.VARCHAR, 'max_length': 64, 'is_partition_key': True}
             ]
         }
         
@@ -275,9 +707,29 @@ class DatabaseManager:
         """Create collection specifically for performance testing"""
         return self.create_collection(collection_name)
     
-    def create_chaos_collection(self, collection_name: str = "chaos_test") -> bool:
+    def create_chaos_collection(self, collection_name: str = "chaos_test", vector_dim: int = 2048) -> bool:
         """Create collection specifically for chaos engineering testing"""
-        return self.create_collection(collection_name)
+        # HNSW suits the small, churny chaos collection; IVF training needs ~39*nlist rows
+        index_config = {
+            'field_name': 'vector',
+            'index_type': 'HNSW',
+            'metric_type': 'L2',
+            'params': {'M': 16, 'efConstruction': 200}
+        }
+        
+        return self.create_collection(collection_name, index_config=index_config, vector_dim=vector_dim)
+    
+    def create_failover_collection(self, collection_name: str = "failover_test", vector_dim: int = 2048) -> bool:
+        """Create collection specifically for failover testing"""
+        # Only a few dozen rows are inserted, far too few to train IVF_FLAT with nlist=1024
+        index_config = {
+            'field_name': 'vector',
+            'index_type': 'HNSW',
+            'metric_type': 'L2',
+            'params': {'M': 16, 'efConstruction': 200}
+        }
+        
+        return self.create_collection(collection_name, index_config=index_config, vector_dim=vector_dim)
     
     def create_reid_collection(self, collection_name: str = "test_collection") -> bool:
         """Create collection specifically for ReID testing"""
@@ -302,13 +754,15 @@ class DatabaseManager:
         
         return self.create_collection(collection_name, schema_config, index_config)
     
-    def insert_data(self, collection_name: str, data: List[Dict]) -> bool:
+    def insert_data(self, collection_name: str, data: List[Dict],
+                    timeout: Optional[float] = None) -> bool:
         """
         Insert data into collection
         
         Args:
             collection_name: Name of the collection
             data: List of dictionaries containing data to insert
+            timeout: Per-RPC deadline in seconds (optional, client default if None)
         
         Returns:
             bool: True if successful, False otherwise
@@ -317,13 +771,32 @@ class DatabaseManager:
             return True
             
         try:
-            self.client.insert(collection_name=collection_name, data=data)
+            with self.pool.acquire() as client:
+                client.insert(collection_name=collection_name, data=data, timeout=timeout)
             logger.debug(f"✅ Inserted {len(data)} records into {collection_name}")
             return True
         except Exception as e:
             logger.error(f"❌ Insert failed: {e}")
             return False
     
+    def flush_collection(self, collection_name: str, timeout: Optional[float] = None) -> bool:
+        """
+        Flush a collection, blocking until inserted data is sealed and persisted
+        
+        Args:
+            collection_name: Name of the collection
+            timeout: Per-RPC deadline in seconds (optional, client default if None)
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            self.client.flush(collection_name, timeout=timeout)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Flush failed: {e}")
+            return False
+    
     def insert_batch_data(self, collection_name: str, data: List[Dict], batch_size: int = 100) -> bool:
         """
         Insert data in batches
@@ -337,19 +810,36 @@ class DatabaseManager:
             bool: True if successful, False otherwise
         """
         try:
-            for i in range(0, len(data), batch_size):
-                batch = data[i:i + batch_size]
-                if not self.insert_data(collection_name, batch):
-                    return False
-                time.sleep(0.1)  # Small delay between batches
+            # Batches go out concurrently, one pooled client per in-flight batch
+            with ThreadPoolExecutor(max_workers=self.pool.size) as executor:
+                futures = [executor.submit(self._insert_one_batch, collection_name, data[i:i + batch_size])
+                           for i in range(0, len(data), batch_size)]
+                for future in as_completed(futures):
+                    if not future.result():
+                        for pending in futures:
+                            pending.cancel()
+                        return False
             return True
         except Exception as e:
             logger.error(f"❌ Batch insert failed: {e}")
             return False
     
+    def _insert_one_batch(self, collection_name: str, batch: List[Dict],
+                          max_attempts: int = 3, backoff: float = 0.2) -> bool:
+        """Insert one batch, retrying failed attempts with exponential backoff"""
+        for attempt in range(max_attempts):
+            if self.insert_data(collection_name, batch):
+                return True
+            if attempt < max_attempts - 1:
+                time.sleep(backoff * (2 ** attempt))
+        return False
+    
     def search_vectors(self, collection_name: str, query_vectors: List[List[float]], 
                       limit: int = 10, filter_expr: Optional[str] = None,
-                      output_fields: Optional[List[str]] = None) -> List[Dict]:
+                      output_fields: Optional[List[str]] = None,
+                      timeout: Optional[float] = None,
+                      consistency_level: Optional[str] = None,
+                      search_params: Optional[Dict] = None) -> List[Dict]:
         """
         Search for similar vectors
         
@@ -359,48 +849,71 @@ class DatabaseManager:
             limit: Maximum number of results per query
             filter_expr: Filter expression (optional)
             output_fields: Fields to return (optional)
+            timeout: Per-RPC deadline in seconds (optional, client default if None)
+            consistency_level: Milvus consistency level, e.g. "Eventually" (optional, collection default if None)
+            search_params: Index search params, e.g. {"metric_type": "L2", "params": {"nprobe": 16}} (optional)
         
         Returns:
             List of search results
         """
+        per_query = self.search_vectors_per_query(
+            collection_name, query_vectors, limit=limit, filter_expr=filter_expr,
+            output_fields=output_fields, timeout=timeout, consistency_level=consistency_level,
+            search_params=search_params
+        )
+        return [match for matches in per_query for match in matches]
+    
+    def search_vectors_per_query(self, collection_name: str, query_vectors: List[List[float]], 
+                                 limit: int = 10, filter_expr: Optional[str] = None,
+                                 output_fields: Optional[List[str]] = None,
+                                 timeout: Optional[float] = None,
+                                 consistency_level: Optional[str] = None,
+                                 search_params: Optional[Dict] = None) -> List[List[Dict]]:
+        """
+        Search for similar vectors, keeping results grouped by query vector
+        
+        Args:
+            collection_name: Name of the collection
+            query_vectors: List of query vectors, sent as a single nq=len(query_vectors) request
+            limit: Maximum number of results per query
+            filter_expr: Filter expression (optional)
+            output_fields: Fields to return (optional)
+            timeout: Per-RPC deadline in seconds (optional, client default if None)
+            consistency_level: Milvus consistency level, e.g. "Eventually" (optional, collection default if None)
+            search_params: Index search params, e.g. {"metric_type": "L2", "params": {"nprobe": 16}} (optional)
+        
+        Returns:
+            One list of search results per query vector (empty list if the search failed)
+        """
         try:
             if output_fields is None:
                 output_fields = ["id", "label", "timestamp"]
             
-            results = self.client.search(
-                collection_name=collection_name,
-                data=query_vectors,
-                filter=filter_expr or "",
-                limit=limit,
-                output_fields=output_fields
-            )
-            
-            matches = []
-            for hits in results:
-                for hit in hits:
-                    # Extract entity data
-                    entity = hit.get('entity', {})
-                    
-                    # Build match dictionary with all requested output fields
-                    match = {'similarity': hit.get('distance', 0.0)}
-                    
-                    # Add all requested output fields
-                    for field in output_fields:
-                        if field in entity:
-                            match[field] = entity[field]
-                        elif field in hit:
-                            match[field] = hit[field]
-                    
-                    matches.append(match)
+            kwargs = {'consistency_level': consistency_level} if consistency_level else {}
+            if search_params:
+                kwargs['search_params'] = search_params
+            with self.pool.acquire() as client:
+                results = client.search(
+                    collection_name=collection_name,
+                    data=query_vectors,
+                    filter=filter_expr or "",
+                    limit=limit,
+                    output_fields=output_fields,
+                    timeout=timeout,
+                    **kwargs
+                )
             
-            return matches
+            fields = tuple(output_fields)
+            return [[_hit_to_match(hit, fields) for hit in hits] for hits in results]
             
         except Exception as e:
             logger.error(f"❌ Search failed: {e}")
             return []
     
     def query_data(self, collection_name: str, filter_expr: str = "", 
-                   output_fields: Optional[List[str]] = None, limit: int = 1000) -> List[Dict]:
+                   output_fields: Optional[List[str]] = None, limit: int = 1000,
+                   timeout: Optional[float] = None,
+                   consistency_level: Optional[str] = None) -> List[Dict]:
         """
         Query data from collection
         
@@ -409,6 +922,8 @@ class DatabaseManager:
             filter_expr: Filter expression
             output_fields: Fields to return (optional)
             limit: Maximum number of results
+            timeout: Per-RPC deadline in seconds (optional, client default if None)
+            consistency_level: Milvus consistency level, e.g. "Strong" (optional, collection default if None)
         
         Returns:
             List of query results
@@ -417,12 +932,16 @@ class DatabaseManager:
             if output_fields is None:
                 output_fields = ["id", "label", "timestamp"]
             
-            results = self.client.query(
-                collection_name=collection_name,
-                filter=filter_expr,
-                output_fields=output_fields,
-                limit=limit
-            )
+            kwargs = {'consistency_level': consistency_level} if consistency_level else {}
+            with self.pool.acquire() as client:
+                results = client.query(
+                    collection_name=collection_name,
+                    filter=filter_expr,
+                    output_fields=output_fields,
+                    limit=limit,
+                    timeout=timeout,
+                    **kwargs
+                )
             
             return results
             
@@ -430,6 +949,123 @@ class DatabaseManager:
             logger.error(f"❌ Query failed: {e}")
             return []
     
+    def query_iterator(self, collection_name: str, filter_expr: str = "",
+                       output_fields: Optional[List[str]] = None, batch_size: int = 1000,
+                       consistency_level: Optional[str] = None) -> Iterator[List[Dict]]:
+        """
+        Query data from collection in batches, without materializing the full result
+        
+        Args:
+            collection_name: Name of the collection
+            filter_expr: Filter expression
+            output_fields: Fields to return (optional)
+            batch_size: Number of rows fetched per round trip
+            consistency_level: Milvus consistency level, e.g. "Strong" (optional, collection default if None)
+        
+        Returns:
+            Iterator over batches of query results (stops early if the query fails)
+        """
+        if output_fields is None:
+            output_fields = ["id", "label", "timestamp"]
+        
+        kwargs = {'consistency_level': consistency_level} if consistency_level else {}
+        iterator = None
+        try:
+            iterator = self.client.query_iterator(
+                collection_name=collection_name,
+                filter=filter_expr,
+                output_fields=output_fields,
+                batch_size=batch_size,
+                **kwargs
+            )
+            while True:
+                batch = iterator.next()
+                if not batch:
+                    break
+                yield batch
+        except Exception as e:
+            logger.error(f"❌ Query iteration failed: {e}")
+        finally:
+            if iterator is not None:
+                iterator.close()
+    
+    def wait_for_collection_ready(self, collection_name: str, timeout: float = 30,
+                                  interval: float = 0.2) -> bool:
+        """
+        Poll until a collection reports as loaded instead of sleeping blindly
+        
+        Only meaningful while the collection is being loaded; load state stays Loaded
+        across node failures, so use wait_for_collection_serving to wait for recovery.
+        
+        Args:
+            collection_name: Name of the collection
+            timeout: Maximum time to wait (seconds)
+            interval: Initial delay between polls, backed off exponentially (seconds)
+        
+        Returns:
+            bool: True if the collection is loaded, False on timeout
+        """
+        def loaded() -> bool:
+            return self.client.get_load_state(collection_name).get('state') == LoadState.Loaded
+        
+        if _poll_until(loaded, timeout, initial=interval):
+            return True
+        
+        logger.warning(f"⚠️ Collection {collection_name} not ready after {timeout}s")
+        return False
+    
+    def wait_for_collection_serving(self, collection_name: str, timeout: float = 60,
+                                    stable_for: float = 3.0, after_disruption: bool = False) -> bool:
+        """
+        Poll until a collection keeps answering queries, e.g. after a node stop or restart
+        
+        Load state stays Loaded while query nodes are down or rejoining, so this issues
+        small Strong-consistency queries (which go through the shard leaders) and only
+        returns once they have succeeded continuously for stable_for seconds. A failure
+        restarts the window.
+        
+        Right after a node is stopped, queries can keep succeeding until its session
+        expires, so with after_disruption successes only count once a query has failed
+        or NODE_SESSION_TTL has passed; a cluster that has not yet noticed the stopped
+        node is then not mistaken for one that has failed over.
+        
+        Args:
+            collection_name: Name of the collection
+            timeout: Maximum time to wait (seconds)
+            stable_for: How long queries must keep succeeding (seconds)
+            after_disruption: A node was just stopped; wait for Milvus to notice it first
+        
+        Returns:
+            bool: True if the collection is serving, False on timeout
+        """
+        first_success: Optional[float] = None
+        disruption_seen = not after_disruption
+        started = time.monotonic()
+        
+        def serving() -> bool:
+            nonlocal first_success, disruption_seen
+            try:
+                self.client.query(collection_name, filter="", limit=1, consistency_level="Strong",
+                                  timeout=EXPECTED_FAILURE_TIMEOUT)
+            except Exception:
+                first_success = None
+                disruption_seen = True
+                raise
+            now = time.monotonic()
+            if not disruption_seen:
+                if now - started < NODE_SESSION_TTL:
+                    return False
+                disruption_seen = True
+            if first_success is None:
+                first_success = now
+            return now - first_success >= stable_for
+        
+        if _poll_until(serving, timeout, initial=0.2, max_interval=1.0):
+            return True
+        
+        logger.warning(f"⚠️ Collection {collection_name} not serving after {timeout}s")
+        return False
+    
     def get_collection_stats(self, collection_name: str) -> Dict:
         """
         Get collection statistics
@@ -455,10 +1091,53 @@ class DatabaseManager:
             data: Dictionary containing data to checksum
         
         Returns:
-            MD5 checksum string
+            Hex checksum string
         """
-        content = f"{data.get('id', '')}_{data.get('label', '')}_{data.get('timestamp', '')}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return self.calculate_checksums_batch([data])[0]
+    
+    def calculate_checksums_batch(self, records: List[Dict]) -> List[str]:
+        """
+        Calculate checksums for many records in a single pass
+        
+        Args:
+            records: List of dictionaries containing data to checksum
+        
+        Returns:
+            List of hex checksum strings, in the same order as records
+        """
+        # Fixed layout (label, timestamp, id length, id bytes) instead of string
+        # formatting; only fields returned by queries are covered so stored
+        # checksums can be re-verified without fetching vectors
+        digest = _record_digest
+        pack = _CHECKSUM_HEADER.pack
+        checksums = []
+        for r in records:
+            record_id = str(r.get('id', '')).encode()
+            header = pack(int(r.get('label', 0)), float(r.get('timestamp', 0.0)), len(record_id))
+            checksums.append(digest(header + record_id))
+        return checksums
+    
+    def find_checksum_mismatches(self, records: List[Dict], expected: Dict[str, str]) -> List[str]:
+        """
+        Compare stored checksums against expected ones in a single vectorized pass
+        
+        Args:
+            records: Rows returned by a query or search, with 'id' and 'checksum' fields
+            expected: Mapping of record id to the checksum recorded at insert time
+        
+        Returns:
+            IDs of records whose stored checksum differs from the expected one
+        """
+        if not records:
+            return []
+        
+        ids = np.array([r['id'] for r in records])
+        actual = np.array([r.get('checksum') or '' for r in records])
+        wanted = np.array([expected.get(record_id, '') for record_id in ids.tolist()])
+        mismatch_mask = actual != wanted
+        if not mismatch_mask.any():
+            return []
+        return ids[mismatch_mask].tolist()
     
     def verify_data_integrity(self, collection_name: str, expected_data: List[Dict]) -> Tuple[int, int]:
         """
@@ -472,20 +1151,37 @@ class DatabaseManager:
             Tuple of (total_records, integrity_errors)
         """
         try:
-            # Query all data
-            all_data = self.query_data(collection_name, output_fields=["id", "label", "timestamp", "checksum"])
+            # Point-look up the inserted ids by primary key instead of scanning the collection
+            expected = {d['id']: d['checksum'] for d in expected_data}
+            ids = list(expected)
+            id_batches = [ids[start:start + ID_QUERY_BATCH_SIZE]
+                          for start in range(0, len(ids), ID_QUERY_BATCH_SIZE)]
+            if not id_batches:
+                return 0, 0
+            
+            def verify_batch(batch: List[str]) -> Tuple[int, List[str]]:
+                rows = self.query_data(
+                    collection_name,
+                    filter_expr=f"id in {json.dumps(batch)}",
+                    output_fields=["id", "checksum"],
+                    limit=len(batch)
+                )
+                # Compare against the checksums recorded at insert time
+                return len(rows), self.find_checksum_mismatches(rows, expected)
+            
+            # Each id batch is fetched and checked on its own pooled client
+            with ThreadPoolExecutor(max_workers=min(len(id_batches), self.pool.size)) as executor:
+                batch_results = list(executor.map(verify_batch, id_batches))
             
+            total_records = 0
             integrity_errors = 0
-            for record in all_data:
-                # Recalculate checksum
-                expected_checksum = self.calculate_checksum(record)
-                actual_checksum = record.get('checksum', '')
-                
-                if expected_checksum != actual_checksum:
-                    integrity_errors += 1
-                    logger.warning(f"Checksum mismatch for {record['id']}")
+            for found, mismatched in batch_results:
+                total_records += found
+                integrity_errors += len(mismatched)
+                for record_id in mismatched:
+                    logger.warning(f"Checksum mismatch for {record_id}")
             
-            return len(all_data), integrity_errors
+            return total_records, integrity_errors
             
         except Exception as e:
             logger.error(f"❌ Data integrity verification failed: {e}")
@@ -504,17 +1200,18 @@ class DatabaseManager:
         Returns:
             List of test data dictionaries
         """
-        test_data = []
-        for i in range(num_records):
-            data = {
-                "id": f"{prefix}_{i}",
-                "vector": np.random.rand(vector_dim).tolist(),
-                "label": i,
-                "timestamp": time.time()
-            }
-            test_data.append(data)
+        # Draw all vectors at once and share one timestamp across the batch.
+        # Rows stay float32 ndarrays; pymilvus serializes them without boxing each float.
+        vectors = np.random.default_rng().random((num_records, vector_dim), dtype=np.float32)
+        ids = _make_ids(prefix, num_records)
+        timestamp = time.time()
         
-        return test_data
+        return [{
+            "id": ids[i],
+            "vector": vectors[i],
+            "label": i,
+            "timestamp": timestamp
+        } for i in range(num_records)]
     
     def generate_reid_test_data(self, num_records: int, vector_dim: int = 2048) -> List[Dict]:
         """
@@ -527,18 +1224,18 @@ class DatabaseManager:
         Returns:
             List of ReID test data dictionaries
         """
-        test_data = []
-        for i in range(num_records):
-            data = {
-                "detection_uuid": f"test_reid_{i}",
-                "reid_matrix": np.random.rand(vector_dim).tolist(),
-                "reid": i,
-                "source_id": f"camera{i % 3 + 1}",
-                "timestamp": time.time()
-            }
-            test_data.append(data)
+        # One RNG call for the whole batch; rows stay float32 ndarrays for pymilvus to serialize
+        vectors = np.random.default_rng().random((num_records, vector_dim), dtype=np.float32)
+        ids = _make_ids("test_reid", num_records)
+        timestamp = time.time()
         
-        return test_data
+        return [{
+            "detection_uuid": ids[i],
+            "reid_matrix": vectors[i],
+            "reid": i,
+            "source_id": f"camera{i % 3 + 1}",
+            "timestamp": timestamp
+        } for i in range(num_records)]
     
     def generate_consistency_test_data(self, num_records: int, vector_dim: int = 2048, prefix: str = "consistency_test") -> List[Dict]:
         """
@@ -555,17 +1252,21 @@ class DatabaseManager:
         # Use a fixed timestamp for all records to ensure checksum consistency
         fixed_timestamp = time.time()
         
-        test_data = []
-        for i in range(num_records):
-            data = {
-                "id": f"{prefix}_{i}",
-                "vector": np.random.rand(vector_dim).tolist(),
-                "label": i,
-                "timestamp": fixed_timestamp,
-                "checksum": ""
-            }
-            data["checksum"] = self.calculate_checksum(data)
-            test_data.append(data)
+        # One RNG call for the whole batch; rows stay float32 ndarrays for pymilvus to serialize
+        vectors = np.random.default_rng().random((num_records, vector_dim), dtype=np.float32)
+        ids = _make_ids(prefix, num_records)
+        
+        test_data = [{
+            "id": ids[i],
+            "vector": vectors[i],
+            "label": i,
+            "timestamp": fixed_timestamp,
+            "checksum": "",
+            "test_tag": prefix
+        } for i in range(num_records)]
+        
+        for data, checksum in zip(test_data, self.calculate_checksums_batch(test_data)):
+            data["checksum"] = checksum
         
         return test_data
     
@@ -580,8 +1281,10 @@ class DatabaseManager:
             bool: True if successful, False otherwise
         """
         try:
-            if self.client.has_collection(collection_name):
+            if collection_name in self._created_collections or self.client.has_collection(collection_name):
                 self.client.drop_collection(collection_name)
+                self._created_collections.discard(collection_name)
+                self._orm_collections.pop(collection_name, None)
                 logger.info(f"✅ Dropped collection: {collection_name}")
                 time.sleep(2)  # Wait for cleanup
                 return True
@@ -596,15 +1299,131 @@ class DatabaseManager:
         """Clean up all test collections"""
         collections_to_clean = [
             "consistency_test", "perf_test", "chaos_test", 
-            "test_collection", "reid_test"
+            "test_collection", "reid_test",
+            "consistency_test_integrity", "consistency_test_replica",
+            "consistency_test_concurrent", "consistency_test_atomicity"
         ]
         
-        success = True
-        for collection_name in collections_to_clean:
-            if not self.drop_collection(collection_name):
-                success = False
+        try:
+            # One list RPC instead of a has_collection probe per name
+            to_drop = set(self.client.list_collections()) & set(collections_to_clean)
+            if not to_drop:
+                return True
+            
+            def drop(collection_name: str) -> bool:
+                try:
+                    self.client.drop_collection(collection_name)
+                    self._created_collections.discard(collection_name)
+                    self._orm_collections.pop(collection_name, None)
+                    logger.info(f"✅ Dropped collection: {collection_name}")
+                    return True
+                except Exception as e:
+                    logger.error(f"❌ Failed to drop collection {collection_name}: {e}")
+                    return False
+            
+            with ThreadPoolExecutor(max_workers=len(to_drop)) as executor:
+                success = all(list(executor.map(drop, to_drop)))
+            
+            # Wait until the drops are visible instead of sleeping per collection
+            _poll_until(lambda: not (set(self.client.list_collections()) & to_drop), timeout=10)
+            return success
+        except Exception as e:
+            logger.error(f"❌ Failed to clean up collections: {e}")
+            return False
+    
+    def close(self):
+        """
+        Release this manager's Milvus client
+        
+        The connection itself is shared with other managers on the same uri and
+        database, so it stays open until close_shared_clients runs at exit.
+        Extra pooled clients and the ORM alias opened by this manager are closed here.
+        """
+        with self._lazy_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+            self._client = None
+        if self._orm_alias is not None:
+            try:
+                connections.disconnect(alias=self._orm_alias)
+            except Exception as e:
+                logger.debug(f"Error disconnecting {self._orm_alias}: {e}")
+            self._orm_alias = None
+            self._orm_collections.clear()
+    
+    @classmethod
+    def close_shared_clients(cls):
+        """Close every shared Milvus client (registered with atexit on first connect)"""
+        with cls._shared_clients_lock:
+            clients = list(cls._shared_clients.values())
+            cls._shared_clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug(f"Error closing Milvus client: {e}")
+    
+    def _get_orm_alias(self) -> str:
+        """Open (once) and return this manager's pymilvus ORM connection alias"""
+        if self._orm_alias is None:
+            alias = f"dm_{id(self)}"
+            connections.connect(alias=alias, uri=self.uri)
+            connections.get_connection(alias=alias).set_database(self.database_name)
+            self._orm_alias = alias
+        return self._orm_alias
+    
+    def _get_orm_collection(self, collection_name: str) -> Collection:
+        """Return this manager's ORM Collection handle, built (one describe RPC) once per name"""
+        collection = self._orm_collections.get(collection_name)
+        if collection is None:
+            collection = Collection(collection_name, using=self._get_orm_alias())
+            self._orm_collections[collection_name] = collection
+        return collection
+    
+    def search_vectors_orm(self, collection_name: str, query_vectors: List[List[float]], 
+                           anns_field: str, search_params: Dict, limit: int = 10,
+                           filter_expr: Optional[str] = None,
+                           output_fields: Optional[List[str]] = None,
+                           timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Search for similar vectors through the ORM Collection.search API
+        
+        Same result format as search_vectors, so the two client paths can be compared directly.
         
-        return success
+        Args:
+            collection_name: Name of the collection
+            query_vectors: List of query vectors
+            anns_field: Vector field to search
+            search_params: Index search params, e.g. {"metric_type": "L2", "params": {"nprobe": 16}}
+            limit: Maximum number of results per query
+            filter_expr: Filter expression (optional)
+            output_fields: Fields to return (optional)
+            timeout: Per-RPC deadline in seconds (optional, client default if None)
+        
+        Returns:
+            List of search results
+        """
+        try:
+            if output_fields is None:
+                output_fields = ["id", "label", "timestamp"]
+            
+            results = self._get_orm_collection(collection_name).search(
+                data=query_vectors,
+                anns_field=anns_field,
+                param=search_params,
+                limit=limit,
+                expr=filter_expr or None,
+                output_fields=output_fields,
+                timeout=timeout
+            )
+            
+            fields = tuple(output_fields)
+            return [_hit_to_match(hit.to_dict(), fields) for hits in results for hit in hits]
+            
+        except Exception as e:
+            logger.error(f"❌ ORM search failed: {e}")
+            return []
     
     def get_replica_info(self, collection_name: str) -> Dict:
         """
@@ -617,15 +1436,10 @@ class DatabaseManager:
             Dictionary containing replica information
         """
         try:
-            # Use pymilvus Collection for replica info
-            connections.connect(alias='replica_check', host='localhost', port='19530')
-            connections.get_connection(alias='replica_check').set_database(self.database_name)
-            
-            collection = Collection(collection_name, using='replica_check')
+            # Use pymilvus Collection for replica info, over an alias kept open between calls
+            collection = Collection(collection_name, using=self._get_orm_alias())
             replicas = collection.get_replicas()
             
-            connections.disconnect(alias='replica_check')
-            
             return {
                 'num_groups': len(replicas.groups),
                 'groups': replicas.groups
@@ -641,28 +1455,51 @@ def create_test_database(uri: str = "http://localhost:19530", database_name: str
     """Create and return a database manager instance"""
     return DatabaseManager(uri, database_name)
 
+def get_database_manager() -> DatabaseManager:
+    """
+    Get the shared database manager, creating it on first use
+    
+    The manager (and its gRPC channel) is reused across calls so repeated
+    quick checks don't pay for a new connection and database selection each time.
+    
+    Returns:
+        Shared DatabaseManager instance
+    """
+    global _SHARED_MANAGER
+    if _SHARED_MANAGER is None:
+        _SHARED_MANAGER = DatabaseManager()
+    return _SHARED_MANAGER
+
 def quick_search_test(collection_name: str = "test_collection", 
-                     query_vector: Optional[List[float]] = None) -> bool:
+                     query_vector: Optional[List[float]] = None,
+                     nq: int = 1) -> bool:
     """
     Quick search test for basic functionality verification
     
     Args:
         collection_name: Name of the collection to search
         query_vector: Query vector (optional, generates random if not provided)
+        nq: Number of query vectors sent in one search request when query_vector
+            is not provided (nq=1 uses the fixed default probe vector)
     
     Returns:
-        bool: True if search successful, False otherwise
+        bool: True if every query returned results, False otherwise
     """
     try:
-        db_manager = DatabaseManager()
+        db_manager = get_database_manager()
         
-        if query_vector is None:
-            query_vector = [0.1] * 2048
+        if query_vector is not None:
+            query_vectors = [np.asarray(query_vector, dtype=np.float32)]
+        elif nq > 1:
+            query_vectors = list(np.random.default_rng().random((nq, _QUICK_QUERY_VECTOR.size), dtype=np.float32))
+        else:
+            query_vectors = [_QUICK_QUERY_VECTOR]
         
-        results = db_manager.search_vectors(collection_name, [query_vector], limit=5)
+        per_query = db_manager.search_vectors_per_query(collection_name, query_vectors, limit=5)
         
-        if results:
-            logger.info(f"✅ Quick search successful: {len(results)} results")
+        if per_query and all(per_query):
+            logger.info(f"✅ Quick search successful: nq={len(per_query)}, "
+                        f"{sum(len(matches) for matches in per_query)} results")
             return True
         else:
             logger.warning("⚠️ Quick search returned no results")
@@ -683,7 +1520,7 @@ def quick_query_test(collection_name: str = "test_collection") -> bool:
         bool: True if query successful, False otherwise
     """
     try:
-        db_manager = DatabaseManager()
+        db_manager = get_database_manager()
         results = db_manager.query_data(collection_name, limit=10)
         
         if results is not None:
@@ -723,16 +1560,14 @@ def check_docker_status() -> Dict[str, bool]:
     ]
     
     try:
-        result = subprocess.run(['docker', 'ps', '--format', '{{.Names}}'], 
-                              capture_output=True, text=True, check=True)
-        running_containers = set(result.stdout.strip().split('\n'))
+        running_containers = get_running_milvus_containers()
         
         status = {}
         for container in required_containers:
             status[container] = container in running_containers
         
         return status
-    except subprocess.CalledProcessError as e:
+    except RuntimeError as e:
         logger.error(f"❌ Failed to check Docker containers: {e}")
         return {container: False for container in required_containers}
 
@@ -744,7 +1579,8 @@ def ensure_all_containers_running() -> bool:
         bool: True if all containers are running, False otherwise
     """
     try:
-        db_manager = DatabaseManager(ensure_docker_running=True)
+        # First call checks containers and connects; later calls re-check but keep the connection
+        get_database_manager().connect()
         logger.info("✅ All containers are running and Milvus is ready")
         return True
     except Exception as e:
@@ -771,7 +1607,7 @@ if __name__ == "__main__":
     
     # Test search
     print("\n3. Testing search...")
-    results = db_manager.search_vectors("test_utils_collection", [[0.1] * 2048], limit=5)
+    results = db_manager.search_vectors("test_utils_collection", [_QUICK_QUERY_VECTOR], limit=5)
     print(f"Search: {'✅ Success' if results else '❌ Failed'} ({len(results)} results)")
     
     # Test query
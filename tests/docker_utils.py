@@ -4,38 +4,348 @@ Docker Utilities for Milvus Testing
 Common functions for Docker container management and verification
 """
 
+import os
+import re
+import shutil
+import json
+import socket
 import subprocess
+import http.client
 import time
+import random
+import tempfile
+import queue
+import atexit
 import logging
-from typing import List, Dict, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Callable, Iterator, List, Dict, FrozenSet, Optional, Sequence, Set, Tuple
+from urllib.parse import quote
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Shared manager reused across test suites and convenience functions
+_SHARED_MANAGER = None
+
+# Every container of the distributed Milvus deployment
+MILVUS_CONTAINERS: Tuple[str, ...] = (
+    'milvus-querynode1', 'milvus-querynode2',
+    'milvus-datanode1', 'milvus-datanode2',
+    'milvus-indexnode1', 'milvus-indexnode2',
+    'milvus-proxy', 'milvus-rootcoord',
+    'milvus-datacoord', 'milvus-querycoord',
+    'milvus-indexcoord', 'milvus-etcd',
+    'milvus-kafka', 'milvus-minio', 'milvus-attu'
+)
+
+# How long (seconds) a `docker ps` snapshot of running containers is reused
+CONTAINER_STATE_TTL = 2.0
+
+# How long (seconds) a detailed `docker inspect` status is reused
+CONTAINER_STATUS_TTL = 0.5
+
+# Status details reported for containers that are not running
+UNKNOWN_DETAILS = {'health': 'unknown', 'started_at': 'unknown', 'image': 'unknown'}
+
+# Fallback polling backoff (seconds) when no `docker events` stream is available
+POLL_INITIAL_DELAY = 0.05
+POLL_BACKOFF_FACTOR = 1.7
+POLL_MAX_DELAY = 2.0
+
+# docker CLI resolved once instead of searching PATH on every spawn
+DOCKER_BIN = shutil.which('docker') or 'docker'
+
+# Docker daemon endpoint; non-UNIX hosts (tcp://, ssh://) fall back to the docker CLI
+DOCKER_HOST = os.getenv('DOCKER_HOST', 'unix:///var/run/docker.sock')
+
+def _docker_socket_path() -> Optional[str]:
+    """Return the daemon's UNIX socket path, or None when the CLI has to be used"""
+    if not DOCKER_HOST.startswith('unix://'):
+        return None
+    path = DOCKER_HOST[len('unix://'):]
+    return path if os.path.exists(path) else None
+
+def _iter_log_chunks(response: http.client.HTTPResponse) -> Iterator[bytes]:
+    """Yield payload chunks of an Engine API log stream, stripping the 8-byte frame headers"""
+    header = response.read(8)
+    if not (len(header) == 8 and header[0] in (0, 1, 2) and header[1:4] == b'\0\0\0'):
+        # TTY containers are not framed at all
+        yield header
+        yield from iter(lambda: response.read(65536), b'')
+        return
+    while len(header) == 8:
+        yield response.read(int.from_bytes(header[4:], 'big'))
+        header = response.read(8)
+
+def _split_lines(chunks: Iterator[bytes]) -> Iterator[str]:
+    """Re-assemble byte chunks into decoded lines without buffering the whole stream"""
+    pending = b''
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b'\n')
+        for line in lines:
+            yield line.decode(errors='replace')
+    if pending:
+        yield pending.decode(errors='replace')
+
+class ContainerState(Enum):
+    """
+    Coarse container state, combining Docker's run state with its healthcheck status
+    
+    Members are unordered and always truthy; compare with == / != or look them up by name.
+    """
+    STARTING = 'starting'
+    RUNNING = 'running'
+    STOPPED = 'stopped'
+    UNHEALTHY = 'unhealthy'
+    NOT_FOUND = 'not_found'
+    UNKNOWN = 'unknown'
+
+# (status, health) pairs from get_containers_status that don't map to plain RUNNING
+_STATE_BY_STATUS = {
+    ('running', 'starting'): ContainerState.STARTING,
+    ('running', 'unhealthy'): ContainerState.UNHEALTHY,
+    ('restarting', None): ContainerState.STARTING,
+    ('paused', None): ContainerState.STOPPED,
+    ('stopped', None): ContainerState.STOPPED,
+    ('not_found', None): ContainerState.NOT_FOUND,
+    ('error', None): ContainerState.UNKNOWN,
+}
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection to the Docker daemon over its UNIX socket"""
+    
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+    
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+class _ContainerEventMonitor:
+    """
+    One long-lived `docker events` subscription that keeps the set of running containers current
+    """
+    
+    def __init__(self):
+        self.running: Set[str] = set()
+        self.alive = False
+        self._condition = threading.Condition()
+        self._process: Optional[subprocess.Popen] = None
+    
+    def start(self, snapshot: Callable[[], Set[str]]) -> bool:
+        """
+        Subscribe to container events and seed the state from a snapshot
+        
+        Args:
+            snapshot: Fresh lookup of the running container names
+            
+        Returns:
+            True if the monitor is live, False if events are unavailable
+        """
+        try:
+            self._process = subprocess.Popen([
+                DOCKER_BIN, 'events', '--filter', 'type=container',
+                '--format', '{{.Actor.Attributes.name}}|{{.Action}}'
+            ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not subscribe to docker events: {e}")
+            return False
+        atexit.register(self.stop)
+        
+        # Subscribe before the snapshot and hold the lock while taking it: events that race
+        # with the snapshot queue up in the pipe and are replayed on top of it in order
+        with self._condition:
+            threading.Thread(target=self._read, daemon=True).start()
+            try:
+                self.running = set(snapshot())
+            except Exception as e:
+                logger.warning(f"⚠️ Could not snapshot running containers: {e}")
+                self.stop()
+                return False
+            self.alive = True
+        return True
+    
+    def _read(self):
+        for line in self._process.stdout:
+            name, _, action = line.strip().partition('|')
+            with self._condition:
+                if action == 'start':
+                    self.running.add(name)
+                elif action in ('die', 'destroy'):
+                    self.running.discard(name)
+                self._condition.notify_all()
+        
+        # Stream closed (daemon restart, old CLI); waiters fall back to polling
+        with self._condition:
+            self.alive = False
+            self._condition.notify_all()
+    
+    def running_snapshot(self) -> FrozenSet[str]:
+        """Copy of the tracked running set, taken under the lock so the reader can't change it mid-copy"""
+        with self._condition:
+            return frozenset(self.running)
+    
+    def wait_for(self, predicate: Callable[[], bool], timeout: float) -> Optional[bool]:
+        """
+        Block until the tracked state satisfies a predicate
+        
+        Args:
+            predicate: Check against the monitor state, evaluated under its lock
+            timeout: Maximum time to wait (seconds)
+            
+        Returns:
+            True if the predicate held, False on timeout, None if the stream died meanwhile
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: not self.alive or predicate(), timeout)
+            if predicate():
+                return True
+            return False if self.alive else None
+    
+    def stop(self):
+        """Terminate the events subscription"""
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            self._process.wait()
+
 class DockerManager:
     """
     Docker container management utilities for Milvus testing
     """
     
     def __init__(self):
-        self.milvus_containers = [
-            'milvus-querynode1',
-            'milvus-querynode2', 
-            'milvus-datanode1',
-            'milvus-datanode2',
-            'milvus-indexnode1',
-            'milvus-indexnode2',
-            'milvus-proxy',
-            'milvus-rootcoord',
-            'milvus-datacoord',
-            'milvus-querycoord',
-            'milvus-indexcoord',
-            'milvus-etcd',
-            'milvus-kafka',
-            'milvus-minio',
-            'milvus-attu'
-        ]
+        self.milvus_containers = MILVUS_CONTAINERS
+        # (monotonic time, names of running containers) from the last `docker ps`
+        self._running_cache: Optional[Tuple[float, Set[str]]] = None
+        # Serialises `docker ps` refreshes so concurrent checks share one snapshot
+        self._running_lock = threading.Lock()
+        # container name -> (monotonic time, status dict) from recent `docker inspect` calls
+        self._status_cache: Dict[str, Tuple[float, Dict[str, str]]] = {}
+        # Talk to the Engine API directly instead of forking the docker CLI for every call
+        self._socket_path = _docker_socket_path()
+        # Shared `docker events` subscription, started on the first verify
+        self._events: Optional[_ContainerEventMonitor] = None
+        self._events_lock = threading.Lock()
+        self._events_unavailable = False
+    
+    def _event_monitor(self) -> Optional[_ContainerEventMonitor]:
+        """
+        Get the live events monitor, starting it on first use
+        
+        Returns:
+            The monitor, or None if docker events are unavailable
+        """
+        with self._events_lock:
+            if self._events is not None and self._events.alive:
+                return self._events
+            if self._events_unavailable:
+                return None
+            
+            monitor = _ContainerEventMonitor()
+            if not monitor.start(lambda: self._running_names(max_age=0)):
+                # Don't keep forking `docker events` on hosts that can't stream them
+                self._events_unavailable = True
+                return None
+            self._events = monitor
+            return monitor
+    
+    def close(self):
+        """Stop the background events subscription"""
+        with self._events_lock:
+            if self._events is not None:
+                self._events.stop()
+                self._events = None
+    
+    def ping(self) -> bool:
+        """
+        Check that the Docker daemon is reachable
+        
+        One GET /_ping over the daemon socket; falls back to `docker version` without a usable socket.
+        
+        Returns:
+            True if the daemon answered, False otherwise
+        """
+        try:
+            response = self._api('GET', '/_ping', timeout=5)
+            if response is not None:
+                return response[0] == 200
+            result = subprocess.run([DOCKER_BIN, 'version', '--format', '{{.Server.Version}}'],
+                                    capture_output=True, text=True, timeout=10)
+            return result.returncode == 0
+        except Exception as e:
+            logger.error(f"❌ Docker daemon is not reachable: {e}")
+            return False
+    
+    def _open_api(self, method: str, path: str,
+                  timeout: float = 30) -> Optional[Tuple[http.client.HTTPConnection, http.client.HTTPResponse]]:
+        """
+        Send a Docker Engine API request over its UNIX socket without reading the body
+        
+        Args:
+            method: HTTP method
+            path: API path, e.g. /containers/json
+            timeout: Socket timeout (seconds)
+            
+        Returns:
+            (open connection, response), or None if the socket is unusable and the CLI should be used;
+            the caller closes the connection
+        """
+        if self._socket_path is None:
+            return None
+        
+        conn = _UnixHTTPConnection(self._socket_path, timeout)
+        try:
+            conn.request(method, path)
+            return conn, conn.getresponse()
+        except (FileNotFoundError, ConnectionRefusedError, PermissionError) as e:
+            conn.close()
+            logger.warning(f"⚠️ Docker socket unavailable ({e}), falling back to the docker CLI")
+            self._socket_path = None
+            return None
+        except Exception:
+            conn.close()
+            raise
+    
+    def _api(self, method: str, path: str, timeout: float = 30) -> Optional[Tuple[int, bytes]]:
+        """
+        Call the Docker Engine API over its UNIX socket
+        
+        Args:
+            method: HTTP method
+            path: API path, e.g. /containers/json
+            timeout: Socket timeout (seconds)
+            
+        Returns:
+            (HTTP status, response body), or None if the socket is unusable and the CLI should be used
+        """
+        opened = self._open_api(method, path, timeout)
+        if opened is None:
+            return None
+        conn, response = opened
+        try:
+            return response.status, response.read()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _api_error(body: bytes) -> str:
+        """Extract the daemon's error message from an API response body"""
+        try:
+            return json.loads(body).get('message', '')
+        except ValueError:
+            return body.decode(errors='replace')
+    
+    def invalidate_state_cache(self):
+        """Forget cached container state after a state change (also for changes made outside this manager)"""
+        self._running_cache = None
+        self._status_cache.clear()
     
     def get_container_status(self, container_name: str) -> Dict[str, str]:
         """
@@ -47,58 +357,129 @@ class DockerManager:
         Returns:
             Dict with container status information
         """
+        return self.get_containers_status([container_name])[container_name]
+    
+    def get_containers_status(self, container_names: Sequence[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Get detailed status of several containers with a single `docker inspect`
+        
+        Args:
+            container_names: Names of the containers
+            
+        Returns:
+            Dict mapping container names to their status information
+        """
+        # Serve recently inspected containers from the cache; only inspect the rest
+        now = time.monotonic()
+        cached = {}
+        for name in container_names:
+            entry = self._status_cache.get(name)
+            if entry is not None and now - entry[0] < CONTAINER_STATUS_TTL:
+                cached[name] = dict(entry[1])
+        stale = [name for name in container_names if name not in cached]
+        if not stale:
+            return cached
+        
         try:
-            # First check if container exists and is running
-            result = subprocess.run([
-                'docker', 'ps', '--filter', f'name={container_name}', '--format', '{{.Names}}'
-            ], capture_output=True, text=True)
-            
-            if container_name not in result.stdout:
-                # Container not running, check if it exists
-                result_all = subprocess.run([
-                    'docker', 'ps', '-a', '--filter', f'name={container_name}', '--format', '{{.Names}}'
-                ], capture_output=True, text=True)
-                
-                if container_name not in result_all.stdout:
-                    return {
-                        'status': 'not_found',
-                        'health': 'unknown',
-                        'started_at': 'unknown',
-                        'image': 'unknown'
-                    }
-                else:
-                    # Container exists but not running
-                    return {
-                        'status': 'stopped',
-                        'health': 'unknown',
-                        'started_at': 'unknown',
-                        'image': 'unknown'
-                    }
-            
-            # Container is running, get detailed info
-            inspect_result = subprocess.run([
-                'docker', 'inspect', container_name,
-                '--format', '{{.State.Status}}|{{.State.Health.Status}}|{{.State.StartedAt}}|{{.Config.Image}}'
-            ], capture_output=True, text=True)
-            
-            if inspect_result.returncode != 0:
-                return {
-                    'status': 'running',
-                    'health': 'unknown',
-                    'started_at': 'unknown',
-                    'image': 'unknown'
-                }
-            
-            parts = inspect_result.stdout.strip().split('|')
-            return {
-                'status': parts[0] if len(parts) > 0 else 'running',
-                'health': parts[1] if len(parts) > 1 else 'unknown',
-                'started_at': parts[2] if len(parts) > 2 else 'unknown',
-                'image': parts[3] if len(parts) > 3 else 'unknown'
-            }
+            found = self._inspect_api(stale)
+            if found is None:
+                found = self._inspect_cli(stale)
+            
+            now = time.monotonic()
+            for name in stale:
+                status = found.get(name, {'status': 'not_found', **UNKNOWN_DETAILS})
+                self._status_cache[name] = (now, status)
+                cached[name] = dict(status)
+            return {name: cached[name] for name in container_names}
         except Exception as e:
-            logger.error(f"Error getting status for {container_name}: {e}")
-            return {'status': 'error', 'health': 'unknown', 'started_at': 'unknown', 'image': 'unknown'}
+            logger.error(f"Error getting status for {', '.join(stale)}: {e}")
+            cached.update({name: {'status': 'error', **UNKNOWN_DETAILS} for name in stale})
+            return {name: cached[name] for name in container_names}
+    
+    @staticmethod
+    def _summarize_state(state: str, health: str, started_at: str, image: str) -> Dict[str, str]:
+        """Map raw inspect fields onto the status dict returned by get_containers_status"""
+        if state in ('running', 'paused', 'restarting'):
+            return {'status': state, 'health': health, 'started_at': started_at, 'image': image}
+        # Container exists but not running (exited, created, dead)
+        return {'status': 'stopped', **UNKNOWN_DETAILS}
+    
+    def _inspect_api(self, container_names: List[str]) -> Optional[Dict[str, Dict[str, str]]]:
+        """Inspect containers concurrently through the Engine API; None if the socket is unusable"""
+        if self._socket_path is None:
+            return None
+        
+        def inspect(name: str) -> Optional[Tuple[int, bytes]]:
+            return self._api('GET', f'/containers/{quote(name)}/json', timeout=10)
+        
+        # One request per container, all in flight at once, so a full sweep costs about one round trip
+        with ThreadPoolExecutor(max_workers=max(len(container_names), 1)) as executor:
+            responses = list(executor.map(inspect, container_names))
+        
+        found = {}
+        for name, response in zip(container_names, responses):
+            if response is None:
+                return None
+            status, body = response
+            if status == 404:
+                # Container does not exist (left out -> not_found)
+                continue
+            if status != 200:
+                logger.error(f"Error inspecting {name}: {self._api_error(body)}")
+                found[name] = {'status': 'error', **UNKNOWN_DETAILS}
+                continue
+            attrs = json.loads(body)
+            state = attrs.get('State') or {}
+            found[name] = self._summarize_state(
+                state.get('Status', ''),
+                (state.get('Health') or {}).get('Status', 'unknown'),
+                state.get('StartedAt', 'unknown'),
+                (attrs.get('Config') or {}).get('Image', 'unknown'))
+        return found
+    
+    def _inspect_cli(self, container_names: List[str]) -> Dict[str, Dict[str, str]]:
+        """Inspect containers with a single `docker inspect` call"""
+        # Missing containers make inspect exit non-zero but the others are still printed
+        result = subprocess.run([
+            DOCKER_BIN, 'inspect', *container_names,
+            '--format', '{{.Name}}|{{.State.Status}}|'
+                        '{{if .State.Health}}{{.State.Health.Status}}{{else}}unknown{{end}}|'
+                        '{{.State.StartedAt}}|{{.Config.Image}}'
+        ], capture_output=True, text=True)
+        
+        found = {}
+        for line in result.stdout.splitlines():
+            parts = line.strip().split('|')
+            if len(parts) < 5:
+                continue
+            name, state, health, started_at, image = parts[:5]
+            found[name.lstrip('/')] = self._summarize_state(state, health, started_at, image)
+        
+        if result.returncode != 0:
+            # Only a "No such object" error means the container is absent (left out -> not_found);
+            # anything else (daemon down, permission denied) is reported as an error
+            errors = result.stderr.splitlines()
+            for name in container_names:
+                if name not in found and not any('No such' in line and name in line for line in errors):
+                    found[name] = {'status': 'error', **UNKNOWN_DETAILS}
+        return found
+    
+    def get_container_state(self, container_name: str) -> ContainerState:
+        """
+        Get the coarse state of a container
+        
+        Args:
+            container_name: Name of the container
+            
+        Returns:
+            ContainerState; RUNNING covers healthy containers and those without a healthcheck
+        """
+        status = self.get_container_status(container_name)
+        key = (status['status'], status['health'])
+        state = _STATE_BY_STATUS.get(key)
+        if state is None:
+            state = _STATE_BY_STATUS.get((key[0], None), ContainerState.RUNNING)
+        return state
     
     def get_all_containers_status(self) -> Dict[str, Dict[str, str]]:
         """
@@ -107,50 +488,111 @@ class DockerManager:
         Returns:
             Dict mapping container names to their status
         """
-        status = {}
-        for container in self.milvus_containers:
-            status[container] = self.get_container_status(container)
-        return status
+        return self.get_containers_status(self.milvus_containers)
+    
+    def _running_names(self, max_age: float = CONTAINER_STATE_TTL) -> Set[str]:
+        """
+        Names of the running containers, from one shared `docker ps` snapshot
+        
+        Args:
+            max_age: Reuse a snapshot up to this old (seconds, 0 forces a fresh check)
+            
+        Returns:
+            Set of running container names; raises if docker cannot be queried
+        """
+        requested = time.monotonic()
+        cached = self._running_cache
+        if cached is not None and requested - cached[0] < max_age:
+            return cached[1]
+        
+        with self._running_lock:
+            # Another thread may have refreshed while we waited; any snapshot taken
+            # after this call started is fresh enough, even for max_age=0
+            cached = self._running_cache
+            if cached is not None and (cached[0] >= requested or time.monotonic() - cached[0] < max_age):
+                return cached[1]
+            
+            taken = time.monotonic()
+            response = self._api('GET', '/containers/json', timeout=10)
+            if response is not None:
+                status, body = response
+                if status != 200:
+                    raise RuntimeError(self._api_error(body))
+                running = {name.lstrip('/') for container in json.loads(body)
+                           for name in container.get('Names', [])}
+            else:
+                result = subprocess.run([
+                    DOCKER_BIN, 'ps', '--format', '{{.Names}}'
+                ], capture_output=True, text=True)
+                if result.returncode != 0:
+                    raise RuntimeError(result.stderr.strip())
+                running = set(result.stdout.splitlines())
+            
+            self._running_cache = (taken, running)
+            return running
+    
+    def get_running_containers(self, max_age: float = CONTAINER_STATE_TTL) -> FrozenSet[str]:
+        """
+        Names of all running containers, from the same shared snapshot is_container_running uses
+        
+        Args:
+            max_age: Reuse a snapshot up to this old (seconds, 0 forces a fresh check)
+            
+        Returns:
+            Frozen set of running container names
+        
+        Raises:
+            RuntimeError: If docker cannot be queried
+        """
+        monitor = self._events
+        if monitor is not None and monitor.alive:
+            return monitor.running_snapshot()
+        return frozenset(self._running_names(max_age))
     
-    def is_container_running(self, container_name: str) -> bool:
+    def is_container_running(self, container_name: str, max_age: float = CONTAINER_STATE_TTL) -> bool:
         """
         Check if a container is running
         
         Args:
             container_name: Name of the container
+            max_age: Reuse a `docker ps` snapshot up to this old (seconds, 0 forces a fresh check)
             
         Returns:
             True if container is running, False otherwise
         """
+        # A live events monitor is always current, so no daemon call is needed
+        monitor = self._events
+        if monitor is not None and monitor.alive:
+            return container_name in monitor.running
+        
         try:
-            result = subprocess.run([
-                'docker', 'ps', '--filter', f'name={container_name}', '--format', '{{.Names}}'
-            ], capture_output=True, text=True)
-            
-            return container_name in result.stdout
+            return container_name in self._running_names(max_age)
         except Exception as e:
             logger.error(f"Error checking if {container_name} is running: {e}")
             return False
     
-    def is_container_stopped(self, container_name: str) -> bool:
+    def is_container_stopped(self, container_name: str, max_age: float = CONTAINER_STATE_TTL) -> bool:
         """
         Check if a container is stopped
         
         Args:
             container_name: Name of the container
+            max_age: Reuse a `docker ps` snapshot up to this old (seconds, 0 forces a fresh check)
             
         Returns:
             True if container is stopped, False otherwise
         """
-        return not self.is_container_running(container_name)
+        return not self.is_container_running(container_name, max_age)
     
-    def stop_container(self, container_name: str, timeout: int = 30) -> bool:
+    def stop_container(self, container_name: str, timeout: int = 30,
+                       grace_period: Optional[int] = None) -> bool:
         """
         Stop a container and verify it's stopped
         
         Args:
             container_name: Name of the container to stop
             timeout: Maximum time to wait for stop (seconds)
+            grace_period: Seconds to wait before SIGKILL (default: Docker's 10s, 0 kills immediately)
             
         Returns:
             True if container stopped successfully, False otherwise
@@ -158,18 +600,27 @@ class DockerManager:
         try:
             logger.info(f"Stopping {container_name}...")
             
-            # Stop the container
-            result = subprocess.run(['docker', 'stop', container_name], 
-                                  capture_output=True, text=True, timeout=timeout)
+            # Stop the container (304 means it was already stopped)
+            query = f'?t={grace_period}' if grace_period is not None else ''
+            response = self._api('POST', f'/containers/{quote(container_name)}/stop{query}', timeout)
+            if response is not None:
+                ok, error = response[0] in (204, 304), self._api_error(response[1])
+            else:
+                cmd = [DOCKER_BIN, 'stop', container_name]
+                if grace_period is not None:
+                    cmd[2:2] = ['-t', str(grace_period)]
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+                ok, error = result.returncode == 0, result.stderr
+            self.invalidate_state_cache()
             
-            if result.returncode != 0:
-                logger.error(f"Failed to stop {container_name}: {result.stderr}")
+            if not ok:
+                logger.error(f"Failed to stop {container_name}: {error}")
                 return False
             
             # Verify it's actually stopped
             return self.verify_container_stopped(container_name, max_attempts=10)
             
-        except subprocess.TimeoutExpired:
+        except (subprocess.TimeoutExpired, socket.timeout):
             logger.error(f"Timeout stopping {container_name}")
             return False
         except Exception as e:
@@ -190,24 +641,63 @@ class DockerManager:
         try:
             logger.info(f"Starting {container_name}...")
             
-            # Start the container
-            result = subprocess.run(['docker', 'start', container_name], 
-                                  capture_output=True, text=True, timeout=timeout)
+            # Start the container (304 means it was already running)
+            response = self._api('POST', f'/containers/{quote(container_name)}/start', timeout)
+            if response is not None:
+                ok, error = response[0] in (204, 304), self._api_error(response[1])
+            else:
+                result = subprocess.run([DOCKER_BIN, 'start', container_name], 
+                                      capture_output=True, text=True, timeout=timeout)
+                ok, error = result.returncode == 0, result.stderr
+            self.invalidate_state_cache()
             
-            if result.returncode != 0:
-                logger.error(f"Failed to start {container_name}: {result.stderr}")
+            if not ok:
+                logger.error(f"Failed to start {container_name}: {error}")
                 return False
             
             # Wait for it to be running
             return self.verify_container_running(container_name, max_attempts=15)
             
-        except subprocess.TimeoutExpired:
+        except (subprocess.TimeoutExpired, socket.timeout):
             logger.error(f"Timeout starting {container_name}")
             return False
         except Exception as e:
             logger.error(f"Error starting {container_name}: {e}")
             return False
     
+    def stop_containers(self, container_names: List[str], timeout: int = 30,
+                        grace_period: Optional[int] = None) -> Dict[str, bool]:
+        """
+        Stop several containers concurrently
+        
+        Args:
+            container_names: Names of the containers to stop
+            timeout: Maximum time to wait for each stop (seconds)
+            grace_period: Seconds to wait before SIGKILL (see stop_container)
+            
+        Returns:
+            Dict mapping container names to whether they stopped successfully
+        """
+        with ThreadPoolExecutor(max_workers=max(len(container_names), 1)) as executor:
+            results = executor.map(lambda name: self.stop_container(name, timeout, grace_period),
+                                   container_names)
+            return dict(zip(container_names, results))
+    
+    def start_containers(self, container_names: List[str], timeout: int = 30) -> Dict[str, bool]:
+        """
+        Start several containers concurrently
+        
+        Args:
+            container_names: Names of the containers to start
+            timeout: Maximum time to wait for each start (seconds)
+            
+        Returns:
+            Dict mapping container names to whether they started successfully
+        """
+        with ThreadPoolExecutor(max_workers=max(len(container_names), 1)) as executor:
+            results = executor.map(lambda name: self.start_container(name, timeout), container_names)
+            return dict(zip(container_names, results))
+    
     def restart_container(self, container_name: str, timeout: int = 30) -> bool:
         """
         Restart a container
@@ -223,43 +713,128 @@ class DockerManager:
             logger.info(f"Restarting {container_name}...")
             
             # Restart the container
-            result = subprocess.run(['docker', 'restart', container_name], 
-                                  capture_output=True, text=True, timeout=timeout)
+            response = self._api('POST', f'/containers/{quote(container_name)}/restart', timeout)
+            if response is not None:
+                ok, error = response[0] == 204, self._api_error(response[1])
+            else:
+                result = subprocess.run([DOCKER_BIN, 'restart', container_name], 
+                                      capture_output=True, text=True, timeout=timeout)
+                ok, error = result.returncode == 0, result.stderr
+            self.invalidate_state_cache()
             
-            if result.returncode != 0:
-                logger.error(f"Failed to restart {container_name}: {result.stderr}")
+            if not ok:
+                logger.error(f"Failed to restart {container_name}: {error}")
                 return False
             
             # Wait for it to be running
             return self.verify_container_running(container_name, max_attempts=15)
             
-        except subprocess.TimeoutExpired:
+        except (subprocess.TimeoutExpired, socket.timeout):
             logger.error(f"Timeout restarting {container_name}")
             return False
         except Exception as e:
             logger.error(f"Error restarting {container_name}: {e}")
             return False
     
+    def _subscribe_events(self, container_names: List[str],
+                          fmt: str) -> Tuple[subprocess.Popen, "queue.Queue[Optional[str]]"]:
+        """
+        Start a `docker events` stream for some containers and feed its lines into a queue
+        
+        Args:
+            container_names: Containers to watch
+            fmt: Go template for each event line
+            
+        Returns:
+            (events process, queue of stripped lines; None marks the end of the stream)
+        """
+        filters = ['--filter', 'type=container']
+        for name in container_names:
+            filters += ['--filter', f'container={name}']
+        events = subprocess.Popen([DOCKER_BIN, 'events', *filters, '--format', fmt],
+                                  stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        
+        def reader():
+            for line in events.stdout:
+                lines.put(line.strip())
+            lines.put(None)  # Stream closed
+        
+        threading.Thread(target=reader, daemon=True).start()
+        return events, lines
+    
+    def _wait_for_event(self, container_name: str, actions: Set[str],
+                        in_state: Callable[[], bool], timeout: float) -> bool:
+        """
+        Wait for a container lifecycle event instead of polling `docker ps`
+        
+        Args:
+            container_name: Name of the container
+            actions: Event actions that signal the target state (e.g. {'start'})
+            in_state: Fresh check of the target state, used before waiting and to confirm an event
+            timeout: Maximum time to wait (seconds)
+            
+        Returns:
+            True if the container reached the target state, False on timeout
+        """
+        # Subscribe before the snapshot so a transition in between is not missed
+        events, lines = self._subscribe_events([container_name], '{{.Action}}')
+        try:
+            if in_state():
+                return True
+            
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                try:
+                    action = lines.get(timeout=remaining)
+                except queue.Empty:
+                    return False
+                if action is None:
+                    break
+                if action in actions and in_state():
+                    return True
+            
+            # The events stream died (e.g. old docker CLI); fall back to polling with
+            # jittered exponential backoff so fast transitions are still caught quickly
+            delay = POLL_INITIAL_DELAY
+            while time.monotonic() < deadline:
+                if in_state():
+                    return True
+                time.sleep(min(random.uniform(delay / 2, delay), max(deadline - time.monotonic(), 0)))
+                delay = min(delay * POLL_BACKOFF_FACTOR, POLL_MAX_DELAY)
+            return in_state()
+        finally:
+            events.terminate()
+            events.wait()
+    
     def verify_container_stopped(self, container_name: str, max_attempts: int = 10) -> bool:
         """
         Verify that a container is actually stopped
         
         Args:
             container_name: Name of the container
-            max_attempts: Maximum number of attempts to check
+            max_attempts: Wait budget in former 2-second polling attempts
             
         Returns:
             True if container is confirmed stopped, False otherwise
         """
-        for attempt in range(max_attempts):
-            if self.is_container_stopped(container_name):
-                logger.info(f"✅ {container_name} is confirmed STOPPED (attempt {attempt + 1})")
-                return True
-            else:
-                logger.info(f"⏳ {container_name} still running (attempt {attempt + 1})")
-                time.sleep(2)
+        monitor = self._event_monitor()
+        stopped = None
+        if monitor is not None:
+            stopped = monitor.wait_for(lambda: container_name not in monitor.running, max_attempts * 2)
+        if stopped is None:
+            # 'kill' only means a signal was sent; 'die'/'stop' mean the process is gone
+            stopped = self._wait_for_event(container_name, {'die', 'stop'},
+                                           lambda: self.is_container_stopped(container_name, max_age=0),
+                                           timeout=max_attempts * 2)
+        if stopped:
+            logger.info(f"✅ {container_name} is confirmed STOPPED")
+            return True
         
-        logger.error(f"❌ {container_name} failed to stop after {max_attempts} attempts")
+        logger.error(f"❌ {container_name} failed to stop after {max_attempts * 2}s")
         return False
     
     def verify_container_running(self, container_name: str, max_attempts: int = 15) -> bool:
@@ -268,22 +843,65 @@ class DockerManager:
         
         Args:
             container_name: Name of the container
-            max_attempts: Maximum number of attempts to check
+            max_attempts: Wait budget in former 2-second polling attempts
             
         Returns:
             True if container is confirmed running, False otherwise
         """
-        for attempt in range(max_attempts):
-            if self.is_container_running(container_name):
-                logger.info(f"✅ {container_name} is confirmed RUNNING (attempt {attempt + 1})")
-                return True
-            else:
-                logger.info(f"⏳ {container_name} still starting (attempt {attempt + 1})")
-                time.sleep(2)
+        monitor = self._event_monitor()
+        running = None
+        if monitor is not None:
+            running = monitor.wait_for(lambda: container_name in monitor.running, max_attempts * 2)
+        if running is None:
+            running = self._wait_for_event(container_name, {'start'},
+                                           lambda: self.is_container_running(container_name, max_age=0),
+                                           timeout=max_attempts * 2)
+        if running:
+            logger.info(f"✅ {container_name} is confirmed RUNNING")
+            return True
         
-        logger.error(f"❌ {container_name} failed to start after {max_attempts} attempts")
+        logger.error(f"❌ {container_name} failed to start after {max_attempts * 2}s")
         return False
     
+    def _iter_container_logs(self, container_name: str, tail: int) -> Iterator[str]:
+        """
+        Stream the last log lines of a container one at a time
+        
+        Args:
+            container_name: Name of the container
+            tail: Number of lines to get
+            
+        Returns:
+            Iterator over log lines; raises RuntimeError if docker reports an error
+        """
+        opened = self._open_api('GET', f'/containers/{quote(container_name)}/logs?stdout=1&tail={tail}')
+        if opened is not None:
+            conn, response = opened
+            try:
+                if response.status != 200:
+                    raise RuntimeError(self._api_error(response.read()))
+                yield from _split_lines(_iter_log_chunks(response))
+            finally:
+                conn.close()
+            return
+        
+        # `docker logs` replays the container's stderr on its own stderr, so spool that to a file
+        # rather than an undrained pipe that could fill up and stall the stream
+        with tempfile.TemporaryFile(mode='w+') as stderr, \
+                subprocess.Popen([DOCKER_BIN, 'logs', '--tail', str(tail), container_name],
+                                 stdout=subprocess.PIPE, stderr=stderr, text=True, bufsize=1) as proc:
+            try:
+                for line in proc.stdout:
+                    yield line.rstrip('\n')
+            finally:
+                # Caller stopped early: don't let docker keep producing lines nobody reads
+                if proc.poll() is None:
+                    proc.terminate()
+            if proc.wait() != 0:
+                stderr.seek(0)
+                lines = stderr.read().strip().splitlines()
+                raise RuntimeError(lines[-1] if lines else f"docker logs exited with {proc.returncode}")
+    
     def get_container_logs(self, container_name: str, tail: int = 20) -> List[str]:
         """
         Get recent logs from a container
@@ -296,20 +914,16 @@ class DockerManager:
             List of log lines
         """
         try:
-            result = subprocess.run([
-                'docker', 'logs', '--tail', str(tail), container_name
-            ], capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                logger.error(f"Failed to get logs for {container_name}: {result.stderr}")
-                return []
-            
-            return result.stdout.strip().split('\n')
+            return list(self._iter_container_logs(container_name, tail))
+        except RuntimeError as e:
+            logger.error(f"Failed to get logs for {container_name}: {e}")
+            return []
         except Exception as e:
             logger.error(f"Error getting logs for {container_name}: {e}")
             return []
     
-    def get_container_logs_filtered(self, container_name: str, keywords: List[str], tail: int = 50) -> List[str]:
+    def get_container_logs_filtered(self, container_name: str, keywords: List[str], tail: int = 50,
+                                    max_hits: Optional[int] = None) -> List[str]:
         """
         Get filtered logs from a container
         
@@ -317,19 +931,31 @@ class DockerManager:
             container_name: Name of the container
             keywords: Keywords to filter for
             tail: Number of lines to get before filtering
+            max_hits: Stop reading the logs once this many lines matched (default: no limit)
             
         Returns:
             List of filtered log lines
         """
         try:
-            logs = self.get_container_logs(container_name, tail)
+            if not keywords:
+                return []
+            # One case-insensitive scan per line instead of one lowercased scan per keyword
+            pattern = re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+            # Filter as lines stream in so the unfiltered tail is never held in memory
             filtered = []
-            
-            for line in logs:
-                if any(keyword.lower() in line.lower() for keyword in keywords):
-                    filtered.append(line)
-            
+            lines = self._iter_container_logs(container_name, tail)
+            try:
+                for line in lines:
+                    if pattern.search(line):
+                        filtered.append(line)
+                        if max_hits is not None and len(filtered) >= max_hits:
+                            break
+            finally:
+                lines.close()
             return filtered
+        except RuntimeError as e:
+            logger.error(f"Failed to get logs for {container_name}: {e}")
+            return []
         except Exception as e:
             logger.error(f"Error getting filtered logs for {container_name}: {e}")
             return []
@@ -341,13 +967,7 @@ class DockerManager:
         Returns:
             Dict with query node statuses
         """
-        query_nodes = ['milvus-querynode1', 'milvus-querynode2']
-        status = {}
-        
-        for node in query_nodes:
-            status[node] = self.get_container_status(node)
-        
-        return status
+        return self.get_containers_status(['milvus-querynode1', 'milvus-querynode2'])
     
     def get_data_nodes_status(self) -> Dict[str, Dict[str, str]]:
         """
@@ -356,23 +976,22 @@ class DockerManager:
         Returns:
             Dict with data node statuses
         """
-        data_nodes = ['milvus-datanode1', 'milvus-datanode2']
-        status = {}
-        
-        for node in data_nodes:
-            status[node] = self.get_container_status(node)
-        
-        return status
+        return self.get_containers_status(['milvus-datanode1', 'milvus-datanode2'])
     
-    def print_container_status_table(self, containers: Optional[List[str]] = None):
+    def print_container_status_table(self, containers: Optional[List[str]] = None,
+                                     statuses: Optional[Dict[str, Dict[str, str]]] = None):
         """
         Print a formatted table of container statuses
         
         Args:
-            containers: List of container names to check (default: all Milvus containers)
+            containers: List of container names to check (default: all in statuses, else all Milvus containers)
+            statuses: Already fetched statuses to print instead of looking them up again
         """
         if containers is None:
-            containers = self.milvus_containers
+            containers = list(statuses) if statuses is not None else self.milvus_containers
+        missing = [name for name in containers if statuses is None or name not in statuses]
+        if missing:
+            statuses = {**(statuses or {}), **self.get_containers_status(missing)}
         
         print("\n📊 Container Status:")
         print("=" * 80)
@@ -380,7 +999,7 @@ class DockerManager:
         print("-" * 80)
         
         for container in containers:
-            status = self.get_container_status(container)
+            status = statuses[container]
             print(f"{container:<20} {status['status']:<12} {status['health']:<12} {status['image']:<20}")
     
     def wait_for_containers_healthy(self, containers: List[str], timeout: int = 120) -> bool:
@@ -394,27 +1013,61 @@ class DockerManager:
         Returns:
             True if all containers are healthy, False otherwise
         """
-        start_time = time.time()
+        def is_healthy(status: Dict[str, str]) -> bool:
+            return status['status'] == 'running' and status['health'] in ['healthy', 'unknown']
         
-        while time.time() - start_time < timeout:
-            all_healthy = True
-            
-            for container in containers:
-                status = self.get_container_status(container)
-                if status['status'] != 'running' or status['health'] not in ['healthy', 'unknown']:
-                    all_healthy = False
-                    break
+        def refresh(names: List[str]) -> Dict[str, bool]:
+            for name in names:
+                self._status_cache.pop(name, None)
+            return {name: is_healthy(status) for name, status in self.get_containers_status(names).items()}
+        
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+        
+        # Subscribe before the snapshot so a health transition in between is not missed
+        events, lines = self._subscribe_events(containers, '{{.Actor.Attributes.name}}|{{.Action}}')
+        try:
+            healthy = refresh(containers)
+            stream_open = True
             
-            if all_healthy:
-                logger.info("✅ All containers are healthy")
-                return True
+            while not all(healthy.values()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.error(f"❌ Timeout waiting for containers to be healthy after {timeout}s")
+                    return False
+                
+                if not stream_open:
+                    # The events stream died (e.g. old docker CLI); fall back to polling
+                    time.sleep(min(5, remaining))
+                    healthy = refresh(containers)
+                    continue
+                
+                try:
+                    line = lines.get(timeout=min(5, remaining))
+                except queue.Empty:
+                    elapsed = int(time.monotonic() - start_time)
+                    logger.info(f"⏳ Waiting for containers to be healthy... ({elapsed}s)")
+                    continue
+                if line is None:
+                    stream_open = False
+                    continue
+                
+                name, _, action = line.partition('|')
+                if name not in healthy:
+                    continue
+                if action == 'health_status: healthy':
+                    healthy[name] = True
+                elif action.startswith('health_status') or action in ('die', 'stop'):
+                    healthy[name] = False
+                elif action in ('start', 'restart', 'unpause'):
+                    # Containers without a healthcheck never report health_status
+                    healthy.update(refresh([name]))
             
-            elapsed = int(time.time() - start_time)
-            logger.info(f"⏳ Waiting for containers to be healthy... ({elapsed}s)")
-            time.sleep(5)
-        
-        logger.error(f"❌ Timeout waiting for containers to be healthy after {timeout}s")
-        return False
+            logger.info("✅ All containers are healthy")
+            return True
+        finally:
+            events.terminate()
+            events.wait()
     
     def cleanup_containers(self, containers: List[str]) -> bool:
         """
@@ -426,70 +1079,77 @@ class DockerManager:
         Returns:
             True if cleanup successful, False otherwise
         """
-        success = True
+        if not containers:
+            return True
         
-        for container in containers:
-            try:
-                # Stop container
-                if self.is_container_running(container):
-                    logger.info(f"Stopping {container}...")
-                    subprocess.run(['docker', 'stop', container], capture_output=True)
-                
-                # Remove container
-                logger.info(f"Removing {container}...")
-                result = subprocess.run(['docker', 'rm', container], capture_output=True, text=True)
+        # Force removal stops a running container itself, so no running check or separate stop
+        logger.info(f"Removing {', '.join(containers)}...")
+        try:
+            if self._socket_path is not None:
+                def remove(container: str) -> Optional[Tuple[int, bytes]]:
+                    return self._api('DELETE', f'/containers/{quote(container)}?force=1')
                 
-                if result.returncode != 0:
-                    logger.error(f"Failed to remove {container}: {result.stderr}")
-                    success = False
-                else:
-                    logger.info(f"✅ {container} removed successfully")
-                    
-            except Exception as e:
-                logger.error(f"Error cleaning up {container}: {e}")
-                success = False
+                with ThreadPoolExecutor(max_workers=len(containers)) as executor:
+                    responses = list(executor.map(remove, containers))
+            else:
+                responses = [None] * len(containers)
+            
+            errors = {container: self._api_error(response[1])
+                      for container, response in zip(containers, responses)
+                      if response is not None and response[0] != 204}
+            
+            # Socket unavailable: one `docker rm -f` for every remaining container
+            fallback = [container for container, response in zip(containers, responses) if response is None]
+            if fallback:
+                result = subprocess.run([DOCKER_BIN, 'rm', '-f', *fallback], capture_output=True, text=True)
+                removed = set(result.stdout.splitlines())
+                for container in fallback:
+                    if container not in removed:
+                        errors[container] = next((line for line in result.stderr.splitlines() if container in line),
+                                                 result.stderr.strip())
+        except Exception as e:
+            logger.error(f"Error cleaning up {', '.join(containers)}: {e}")
+            return False
+        finally:
+            self.invalidate_state_cache()
         
-        return success
+        for container in containers:
+            if container in errors:
+                logger.error(f"Failed to remove {container}: {errors[container]}")
+            else:
+                logger.info(f"✅ {container} removed successfully")
+        return not errors
 
 # Convenience functions for common operations
+def get_docker_manager() -> DockerManager:
+    """Get the shared DockerManager, creating it on first use"""
+    global _SHARED_MANAGER
+    if _SHARED_MANAGER is None:
+        _SHARED_MANAGER = DockerManager()
+    return _SHARED_MANAGER
+
 def get_milvus_containers() -> List[str]:
     """Get list of all Milvus container names"""
-    return [
-        'milvus-querynode1', 'milvus-querynode2',
-        'milvus-datanode1', 'milvus-datanode2',
-        'milvus-indexnode1', 'milvus-indexnode2',
-        'milvus-proxy', 'milvus-rootcoord',
-        'milvus-datacoord', 'milvus-querycoord',
-        'milvus-indexcoord', 'milvus-etcd',
-        'milvus-kafka', 'milvus-minio', 'milvus-attu'
-    ]
+    return list(MILVUS_CONTAINERS)
 
-def quick_status_check() -> None:
-    """Quick status check of all Milvus containers"""
-    docker_manager = DockerManager()
-    docker_manager.print_container_status_table()
+def quick_status_check() -> Dict[str, Dict[str, str]]:
+    """Quick status check of all Milvus containers; returns the statuses it printed"""
+    docker_manager = get_docker_manager()
+    statuses = docker_manager.get_all_containers_status()
+    docker_manager.print_container_status_table(statuses=statuses)
+    return statuses
 
 def stop_query_nodes() -> bool:
     """Stop both query nodes"""
-    docker_manager = DockerManager()
-    success = True
-    
-    for node in ['milvus-querynode1', 'milvus-querynode2']:
-        if not docker_manager.stop_container(node):
-            success = False
-    
-    return success
+    docker_manager = get_docker_manager()
+    results = docker_manager.stop_containers(['milvus-querynode1', 'milvus-querynode2'])
+    return all(results.values())
 
 def start_query_nodes() -> bool:
     """Start both query nodes"""
-    docker_manager = DockerManager()
-    success = True
-    
-    for node in ['milvus-querynode1', 'milvus-querynode2']:
-        if not docker_manager.start_container(node):
-            success = False
-    
-    return success
+    docker_manager = get_docker_manager()
+    results = docker_manager.start_containers(['milvus-querynode1', 'milvus-querynode2'])
+    return all(results.values())
 
 if __name__ == "__main__":
     # Example usage
@@ -500,6 +1160,6 @@ if __name__ == "__main__":
     quick_status_check()
     
     # Example: Get query nodes status
-    docker_manager = DockerManager()
+    docker_manager = get_docker_manager()
     query_status = docker_manager.get_query_nodes_status()
     print(f"\nQuery Nodes Status: {query_status}")
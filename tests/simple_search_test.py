@@ -4,16 +4,18 @@ Simple Search Test
 Stimulates a search to see what happens
 """
 
-import time
-from docker_utils import DockerManager
+from concurrent.futures import ThreadPoolExecutor
 from database_utils import quick_search_test, quick_query_test
 
-def test_search():
+def test_search(nq: int = 1):
     """
     Test a simple search operation
+    
+    Args:
+        nq: Number of query vectors to send in the single search request
     """
-    print("   🔍 Attempting search...")
-    return quick_search_test("test_collection")
+    print(f"   🔍 Attempting search (nq={nq})...")
+    return quick_search_test("test_collection", nq=nq)
 
 def test_query():
     """
@@ -39,19 +41,15 @@ def main():
     print("\n📊 Test 2: Basic Query")
     query_success = test_query()
     
-    # Test 3: Multiple searches
+    # Test 3: Multiple searches, batched into one nq=3 request
     print("\n📊 Test 3: Multiple Searches")
-    for i in range(3):
-        print(f"   Search {i+1}/3:")
-        test_search()
-        time.sleep(1)
+    test_search(nq=3)
     
-    # Test 4: Multiple queries
+    # Test 4: Multiple queries, issued concurrently over the shared client pool
     print("\n📊 Test 4: Multiple Queries")
-    for i in range(3):
-        print(f"   Query {i+1}/3:")
-        test_query()
-        time.sleep(1)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(test_query) for _ in range(3)]
+    print(f"   Concurrent queries: {sum(f.result() for f in futures)}/3 succeeded")
     
     # Summary
     print("\n" + "="*60)
@@ -7,12 +7,16 @@ Runs all test suites and provides detailed reporting
 import time
 import sys
 import os
-from typing import Dict, List, Tuple
-from docker_utils import DockerManager, quick_status_check
+import argparse
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from docker_utils import get_docker_manager, quick_status_check
+from database_utils import ensure_all_containers_running
 
 # Import test modules
 try:
     from test_replication import MilvusDistributedManagerV2
+    from failover_test import FailoverTester
     from performance_test import PerformanceTester
     from chaos_engineering_test import ChaosEngineer
     from consistency_test import ConsistencyTester
@@ -25,7 +29,7 @@ class TestRunner:
     """Comprehensive test runner for distributed Milvus"""
     
     def __init__(self):
-        self.docker_manager = DockerManager()
+        self.docker_manager = get_docker_manager()
         self.results = {}
         self.start_time = time.time()
         
@@ -33,21 +37,14 @@ class TestRunner:
         """Check if all prerequisites are met"""
         print("🔍 Checking Prerequisites...")
         
-        # Check if Docker is running
-        try:
-            import subprocess
-            result = subprocess.run(['docker', 'ps'], capture_output=True, text=True)
-            if result.returncode != 0:
-                print("❌ Docker is not running")
-                return False
-        except FileNotFoundError:
-            print("❌ Docker is not installed")
+        # Check if Docker is running with one request to the daemon socket, no docker CLI process
+        if not self.docker_manager.ping():
+            print("❌ Docker is not running")
             return False
         
         # Check and ensure all Milvus containers are running
         print("   📊 Checking and starting Milvus services...")
         try:
-            from database_utils import ensure_all_containers_running
             success = ensure_all_containers_running()
             if not success:
                 print("   ❌ Failed to start all required containers")
@@ -68,18 +65,20 @@ class TestRunner:
         try:
             manager = MilvusDistributedManagerV2()
             
-            # Test basic functionality
+            # Test basic functionality; one float32 vector shared by every record and the search
+            vector = np.full(2048, 0.1, dtype=np.float32)
+            timestamp = time.time()
             test_data = [{
                 "detection_uuid": f"runner_test_{i}",
-                "reid_matrix": [0.1] * 2048,
+                "reid_matrix": vector,
                 "reid": i,
                 "source_id": f"camera{i % 3 + 1}",
-                "timestamp": time.time()
+                "timestamp": timestamp
             } for i in range(5)]
             
             success = manager.insert_reid(test_data)
             if success:
-                results = manager.search_reid([0.1] * 2048, limit=5)
+                results = manager.search_reid(vector, limit=5)
                 success = len(results) > 0
             
             self.results['replication_test'] = success
@@ -98,9 +97,11 @@ class TestRunner:
         print("="*60)
         
         try:
-            from failover_test import FailoverTester
             failover_tester = FailoverTester()
-            success = failover_tester.run_failover_suite()
+            try:
+                success = failover_tester.run_failover_suite()
+            finally:
+                failover_tester.close()
             self.results['failover_test'] = success
             print(f"✅ Failover test: {'PASS' if success else 'FAIL'}")
             return success
@@ -203,11 +204,11 @@ class TestRunner:
         
         return self.results
     
-    def generate_report(self) -> str:
-        """Generate comprehensive test report"""
+    def _report_parts(self) -> List[str]:
+        """Build the test report as a list of text chunks, in order"""
         total_time = time.time() - self.start_time
         
-        report = f"""
+        parts = [f"""
 {'='*80}
 COMPREHENSIVE TEST REPORT
 {'='*80}
@@ -215,83 +216,82 @@ Test Date: {time.strftime('%Y-%m-%d %H:%M:%S')}
 Total Duration: {total_time:.1f} seconds
 
 TEST RESULTS:
-"""
+"""]
         
         passed = 0
         total = len(self.results)
         
         for test_name, result in self.results.items():
             status = "✅ PASS" if result else "❌ FAIL"
-            report += f"   {test_name.replace('_', ' ').title()}: {status}\n"
+            parts.append(f"   {test_name.replace('_', ' ').title()}: {status}\n")
             if result:
                 passed += 1
         
-        report += f"""
+        parts.append(f"""
 SUMMARY:
    Total Tests: {total}
    Passed: {passed}
    Failed: {total - passed}
    Success Rate: {(passed/total)*100:.1f}%
 
-OVERALL STATUS: """
+OVERALL STATUS: """)
         
         if passed == total:
-            report += "🎉 ALL TESTS PASSED! System is fully operational.\n"
+            parts.append("🎉 ALL TESTS PASSED! System is fully operational.\n")
         elif passed >= total * 0.8:
-            report += "⚠️ MOSTLY SUCCESSFUL - Minor issues detected.\n"
+            parts.append("⚠️ MOSTLY SUCCESSFUL - Minor issues detected.\n")
         else:
-            report += "❌ SIGNIFICANT ISSUES - System may not be fully operational.\n"
+            parts.append("❌ SIGNIFICANT ISSUES - System may not be fully operational.\n")
         
-        report += f"""
+        parts.append("""
 RECOMMENDATIONS:
-"""
-        
-        if self.results.get('replication_test', False):
-            report += "   ✅ Replication: Database-level replicas working correctly\n"
-        else:
-            report += "   ❌ Replication: Check replica configuration\n"
-        
-        if self.results.get('failover_test', False):
-            report += "   ✅ Failover: Node failover and recovery working correctly\n"
-        else:
-            report += "   ❌ Failover: Check failover configuration\n"
+""")
         
-        if self.results.get('performance_test', False):
-            report += "   ✅ Performance: System performance is acceptable\n"
-        else:
-            report += "   ❌ Performance: Consider performance optimization\n"
-        
-        if self.results.get('chaos_test', False):
-            report += "   ✅ Resilience: System is resilient to failures\n"
-        else:
-            report += "   ❌ Resilience: System may not be fully resilient\n"
-        
-        if self.results.get('consistency_test', False):
-            report += "   ✅ Consistency: Data integrity is maintained\n"
-        else:
-            report += "   ❌ Consistency: Data integrity may be compromised\n"
+        # (result key, line when passed, line when failed)
+        recommendations = [
+            ('replication_test', "   ✅ Replication: Database-level replicas working correctly\n",
+             "   ❌ Replication: Check replica configuration\n"),
+            ('failover_test', "   ✅ Failover: Node failover and recovery working correctly\n",
+             "   ❌ Failover: Check failover configuration\n"),
+            ('performance_test', "   ✅ Performance: System performance is acceptable\n",
+             "   ❌ Performance: Consider performance optimization\n"),
+            ('chaos_test', "   ✅ Resilience: System is resilient to failures\n",
+             "   ❌ Resilience: System may not be fully resilient\n"),
+            ('consistency_test', "   ✅ Consistency: Data integrity is maintained\n",
+             "   ❌ Consistency: Data integrity may be compromised\n"),
+        ]
+        parts.extend(ok if self.results.get(key, False) else failed for key, ok, failed in recommendations)
         
-        report += f"""
+        parts.append(f"""
 {'='*80}
-"""
+""")
         
-        return report
+        return parts
     
-    def save_report(self, filename: str = "test_report.txt"):
-        """Save test report to file"""
-        report = self.generate_report()
+    def generate_report(self) -> str:
+        """Generate comprehensive test report"""
+        return "".join(self._report_parts())
+    
+    def save_report(self, filename: str = "test_report.txt", report: Optional[str] = None):
+        """
+        Save test report to file
         
+        Args:
+            filename: Output file path
+            report: Report text already generated for printing (optional, built here if None)
+        """
         try:
             with open(filename, 'w') as f:
-                f.write(report)
+                if report is None:
+                    f.writelines(self._report_parts())
+                else:
+                    f.write(report)
             print(f"📄 Test report saved to: {filename}")
         except Exception as e:
             print(f"❌ Failed to save report: {e}")
 
 def main():
     """Main function to run all tests"""
-    import argparse
-    
     parser = argparse.ArgumentParser(description='Run comprehensive tests for distributed Milvus')
     parser.add_argument('--suites', nargs='+', 
                        choices=['replication_test', 'failover_test', 'performance_test', 'chaos_test', 'consistency_test'],
@@ -316,8 +316,9 @@ def main():
     results = runner.run_all_tests(test_suites)
     
     # Generate and save report
-    print(runner.generate_report())
-    runner.save_report(args.report)
+    report = runner.generate_report()
+    print(report)
+    runner.save_report(args.report, report)
     
     # Exit with appropriate code
     if all(results.values()):